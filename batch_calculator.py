@@ -0,0 +1,462 @@
+from typing import Mapping, NamedTuple, Sequence, Tuple, Union
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+from instrumentation import DAMAGE_STAGE_NAMES, pipeline_stats
+
+# Parameter order of calculate_outgoing_damage, minus universal_dmg_reduction_sources
+# which is a list per scenario and handled separately.
+DAMAGE_PARAMETER_NAMES: Tuple[str, ...] = (
+    "skill_multiplier",
+    "scaling_attribute_value",
+    "extra_multiplier",
+    "extra_dmg",
+    "elemental_dmg_bonus_percent",
+    "all_type_dmg_bonus_percent",
+    "dot_dmg_bonus_percent",
+    "other_dmg_bonus_percent",
+    "attacker_level",
+    "enemy_base_def",
+    "enemy_def_percent_buffs_debuffs",
+    "def_reduction_percent",
+    "def_ignore_percent",
+    "enemy_current_res_percent",
+    "res_pen_percent",
+    "elemental_dmg_taken_bonus_percent",
+    "all_type_dmg_taken_bonus_percent",
+    "weaken_percent",
+)
+
+# One float64 field per intermediate stage, as returned by the explain mode.
+DAMAGE_BREAKDOWN_DTYPE = np.dtype([(stage, np.float64) for stage in DAMAGE_STAGE_NAMES])
+
+# Full argument order of calculate_outgoing_damage.
+DAMAGE_ARGUMENT_NAMES: Tuple[str, ...] = DAMAGE_PARAMETER_NAMES[:-1] + (
+    "universal_dmg_reduction_sources",
+    "weaken_percent",
+)
+
+
+class RaggedSources(NamedTuple):
+    """
+    CSR representation of per-row universal_dmg_reduction_sources.
+
+    The sources of row i are values[offsets[i]:offsets[i + 1]]; offsets has
+    one more entry than there are rows, starts at 0 and ends at len(values).
+    """
+
+    offsets: np.ndarray
+    values: np.ndarray
+
+    @classmethod
+    def from_lists(cls, source_lists: Sequence[Sequence[float]]) -> "RaggedSources":
+        counts = np.fromiter((len(sources) for sources in source_lists), dtype=np.int64, count=len(source_lists))
+        offsets = np.zeros(len(source_lists) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        values = np.fromiter(
+            (source for sources in source_lists for source in sources), dtype=np.float64, count=int(offsets[-1])
+        )
+        return cls(offsets, values)
+
+
+def _as_float_array(value: ArrayLike) -> np.ndarray:
+    return np.asarray(value, dtype=np.float64)
+
+
+def calculate_universal_dmg_reduction_multiplier_ragged(sources: RaggedSources) -> np.ndarray:
+    """
+    Step 7 (Universal_DMG_Reduction_Multiplier) for every row of a ragged source set.
+
+    Computes the product of (1 - source) over each row's segment with a single
+    segmented reduction. Segments are reduced left to right, so each result is
+    bit-identical to the scalar loop; rows without sources get 1.0.
+
+    Args:
+        sources: The per-row reduction sources in CSR form.
+
+    Returns:
+        A float64 array with one multiplier per row.
+    """
+    offsets = np.asarray(sources.offsets, dtype=np.int64)
+    factors = 1 - np.asarray(sources.values, dtype=np.float64)
+    counts = np.diff(offsets)
+    multiplier = np.ones(len(counts), dtype=np.float64)
+    non_empty = counts > 0
+    if non_empty.any():
+        # reduceat cannot express empty segments, so reduce only the non-empty ones; each then
+        # runs up to the next non-empty start, which is exactly its own end offset.
+        multiplier[non_empty] = np.multiply.reduceat(factors, offsets[:-1][non_empty])
+    return multiplier
+
+
+def calculate_universal_dmg_reduction_multiplier_batch(
+    universal_dmg_reduction_sources: Union[Sequence[ArrayLike], RaggedSources],
+) -> np.ndarray:
+    """
+    Step 7 (Universal_DMG_Reduction_Multiplier) for the batch path.
+
+    Args:
+        universal_dmg_reduction_sources: A sequence of sources, each a scalar or an array
+            broadcast across rows, or a RaggedSources with a different number of sources per row.
+
+    Returns:
+        The multiplier as a float64 array (0-d when no source varies by row).
+    """
+    if isinstance(universal_dmg_reduction_sources, RaggedSources):
+        return calculate_universal_dmg_reduction_multiplier_ragged(universal_dmg_reduction_sources)
+    universal_dmg_reduction_multiplier = np.float64(1.0)
+    for reduction_source in universal_dmg_reduction_sources:
+        universal_dmg_reduction_multiplier = universal_dmg_reduction_multiplier * (
+            1 - _as_float_array(reduction_source)
+        )
+    return np.asarray(universal_dmg_reduction_multiplier)
+
+
+def calculate_base_dmg_batch(
+    skill_multiplier: ArrayLike,
+    scaling_attribute_value: ArrayLike,
+    extra_multiplier: ArrayLike,
+    extra_dmg: ArrayLike,
+) -> np.ndarray:
+    """
+    Step 1 (Base_DMG) for the batch path.
+    """
+    return (
+        _as_float_array(skill_multiplier) + _as_float_array(extra_multiplier)
+    ) * _as_float_array(scaling_attribute_value) + _as_float_array(extra_dmg)
+
+
+def calculate_dmg_percent_multiplier_batch(
+    elemental_dmg_bonus_percent: ArrayLike,
+    all_type_dmg_bonus_percent: ArrayLike,
+    dot_dmg_bonus_percent: ArrayLike,
+    other_dmg_bonus_percent: ArrayLike,
+) -> np.ndarray:
+    """
+    Step 2 (DMG_Percent_Multiplier) for the batch path.
+    """
+    return (
+        1
+        + _as_float_array(elemental_dmg_bonus_percent)
+        + _as_float_array(all_type_dmg_bonus_percent)
+        + _as_float_array(dot_dmg_bonus_percent)
+        + _as_float_array(other_dmg_bonus_percent)
+    )
+
+
+def calculate_enemy_final_def_batch(
+    enemy_base_def: ArrayLike,
+    enemy_def_percent_buffs_debuffs: ArrayLike,
+    def_reduction_percent: ArrayLike,
+    def_ignore_percent: ArrayLike,
+) -> np.ndarray:
+    """
+    Step 3 (Enemy_Final_DEF) for the batch path.
+    """
+    enemy_final_def = _as_float_array(enemy_base_def) * (
+        1
+        + _as_float_array(enemy_def_percent_buffs_debuffs)
+        - (_as_float_array(def_reduction_percent) + _as_float_array(def_ignore_percent))
+    )
+    return np.maximum(enemy_final_def, 0.0)  # DEF cannot go below 0
+
+
+def calculate_def_multiplier_batch(enemy_final_def: ArrayLike, attacker_level: ArrayLike) -> np.ndarray:
+    """
+    Step 4 (DEF_Multiplier) for the batch path, from the result of Step 3.
+    """
+    enemy_final_def = _as_float_array(enemy_final_def)
+    def_multiplier_denominator = enemy_final_def + 200 + (10 * _as_float_array(attacker_level))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(
+            def_multiplier_denominator == 0,
+            1.0,
+            1 - (enemy_final_def / def_multiplier_denominator),
+        )
+
+
+def calculate_res_multiplier_batch(enemy_current_res_percent: ArrayLike, res_pen_percent: ArrayLike) -> np.ndarray:
+    """
+    Step 5 (RES_Multiplier) for the batch path.
+    """
+    effective_res = _as_float_array(enemy_current_res_percent) - _as_float_array(res_pen_percent)
+    clamped_effective_res = np.clip(effective_res, -1.0, 0.9)
+    return 1 - clamped_effective_res
+
+
+def calculate_dmg_taken_multiplier_batch(
+    elemental_dmg_taken_bonus_percent: ArrayLike,
+    all_type_dmg_taken_bonus_percent: ArrayLike,
+) -> np.ndarray:
+    """
+    Step 6 (DMG_Taken_Multiplier) for the batch path.
+    """
+    return (
+        1
+        + _as_float_array(elemental_dmg_taken_bonus_percent)
+        + _as_float_array(all_type_dmg_taken_bonus_percent)
+    )
+
+
+def calculate_weaken_multiplier_batch(weaken_percent: ArrayLike) -> np.ndarray:
+    """
+    Step 8 (Weaken_Multiplier) for the batch path.
+    """
+    return 1 - _as_float_array(weaken_percent)
+
+
+# The factors of the final product, left to right (Enemy_Final_DEF only feeds Step 4).
+DAMAGE_PRODUCT_FACTORS: Tuple[str, ...] = (
+    "base_dmg",
+    "dmg_percent_multiplier",
+    "def_multiplier",
+    "res_multiplier",
+    "dmg_taken_multiplier",
+    "universal_dmg_reduction_multiplier",
+    "weaken_multiplier",
+)
+
+
+def calculate_outgoing_damage_batch(
+    skill_multiplier: ArrayLike,
+    scaling_attribute_value: ArrayLike,
+    extra_multiplier: ArrayLike,
+    extra_dmg: ArrayLike,
+    elemental_dmg_bonus_percent: ArrayLike,
+    all_type_dmg_bonus_percent: ArrayLike,
+    dot_dmg_bonus_percent: ArrayLike,
+    other_dmg_bonus_percent: ArrayLike,
+    attacker_level: ArrayLike,
+    enemy_base_def: ArrayLike,
+    enemy_def_percent_buffs_debuffs: ArrayLike,
+    def_reduction_percent: ArrayLike,
+    def_ignore_percent: ArrayLike,
+    enemy_current_res_percent: ArrayLike,
+    res_pen_percent: ArrayLike,
+    elemental_dmg_taken_bonus_percent: ArrayLike,
+    all_type_dmg_taken_bonus_percent: ArrayLike,
+    universal_dmg_reduction_sources: Union[Sequence[ArrayLike], RaggedSources],
+    weaken_percent: ArrayLike,
+    explain: bool = False,
+) -> np.ndarray:
+    """
+    Vectorized version of calculate_outgoing_damage.
+
+    Every parameter accepts a scalar or an array; inputs are broadcast against
+    each other with the usual NumPy rules, and each of the eight stages is
+    evaluated as a whole-array operation. The operations are performed in the
+    same order as the scalar function, so every element of the result is
+    bit-identical to calling calculate_outgoing_damage on that scenario.
+
+    Args:
+        skill_multiplier: The skill's damage multiplier (e.g., 0.6 for 60%).
+        scaling_attribute_value: The value of the character's scaling attribute (ATK, HP, or DEF).
+        extra_multiplier: An additional damage multiplier (e.g., 0.2 for 20%).
+        extra_dmg: A flat amount of extra damage.
+        elemental_dmg_bonus_percent: Elemental damage bonus percentage.
+        all_type_dmg_bonus_percent: All type damage bonus percentage.
+        dot_dmg_bonus_percent: Damage over time (DoT) bonus percentage.
+        other_dmg_bonus_percent: Other miscellaneous damage bonus percentage.
+        attacker_level: The attacker's character level.
+        enemy_base_def: The enemy's base defense value.
+        enemy_def_percent_buffs_debuffs: Enemy DEF percentage buffs or debuffs.
+        def_reduction_percent: Defense reduction percentage.
+        def_ignore_percent: Defense ignore percentage.
+        enemy_current_res_percent: Enemy's current resistance percentage.
+        res_pen_percent: Resistance penetration percentage.
+        elemental_dmg_taken_bonus_percent: Elemental damage taken bonus percentage.
+        all_type_dmg_taken_bonus_percent: All type damage taken bonus percentage.
+        universal_dmg_reduction_sources: A sequence of universal damage reduction sources.
+            Each source may itself be a scalar or an array broadcast against the other inputs.
+            Alternatively a RaggedSources holding a different number of sources per row.
+        weaken_percent: Weaken percentage (e.g., 0.15 for 15%).
+        explain: If True, return every intermediate stage instead of only the final damage.
+
+    Returns:
+        A float64 array of final outgoing damage with the broadcast shape of the inputs.
+        With explain=True, a structured array of the same shape with DAMAGE_BREAKDOWN_DTYPE
+        (base_dmg, dmg_percent_multiplier, enemy_final_def, def_multiplier, res_multiplier,
+        dmg_taken_multiplier, universal_dmg_reduction_multiplier, weaken_multiplier, outgoing_dmg).
+    """
+    timer = pipeline_stats.stage_timer("batch") if pipeline_stats.enabled else None
+
+    # 1. Base_DMG
+    base_dmg = calculate_base_dmg_batch(skill_multiplier, scaling_attribute_value, extra_multiplier, extra_dmg)
+    if timer is not None:
+        timer.lap("base_dmg", base_dmg)
+
+    # 2. DMG_Percent_Multiplier
+    dmg_percent_multiplier = calculate_dmg_percent_multiplier_batch(
+        elemental_dmg_bonus_percent, all_type_dmg_bonus_percent, dot_dmg_bonus_percent, other_dmg_bonus_percent
+    )
+    if timer is not None:
+        timer.lap("dmg_percent_multiplier", dmg_percent_multiplier)
+
+    # 3. Enemy_Final_DEF
+    enemy_final_def = calculate_enemy_final_def_batch(
+        enemy_base_def, enemy_def_percent_buffs_debuffs, def_reduction_percent, def_ignore_percent
+    )
+    if timer is not None:
+        timer.lap("enemy_final_def", enemy_final_def)
+
+    # 4. DEF_Multiplier
+    def_multiplier = calculate_def_multiplier_batch(enemy_final_def, attacker_level)
+    if timer is not None:
+        timer.lap("def_multiplier", def_multiplier)
+
+    # 5. RES_Multiplier
+    res_multiplier = calculate_res_multiplier_batch(enemy_current_res_percent, res_pen_percent)
+    if timer is not None:
+        timer.lap("res_multiplier", res_multiplier)
+
+    # 6. DMG_Taken_Multiplier
+    dmg_taken_multiplier = calculate_dmg_taken_multiplier_batch(
+        elemental_dmg_taken_bonus_percent, all_type_dmg_taken_bonus_percent
+    )
+    if timer is not None:
+        timer.lap("dmg_taken_multiplier", dmg_taken_multiplier)
+
+    # 7. Universal_DMG_Reduction_Multiplier
+    universal_dmg_reduction_multiplier = calculate_universal_dmg_reduction_multiplier_batch(
+        universal_dmg_reduction_sources
+    )
+    if timer is not None:
+        timer.lap("universal_dmg_reduction_multiplier", universal_dmg_reduction_multiplier)
+
+    # 8. Weaken_Multiplier
+    weaken_multiplier = calculate_weaken_multiplier_batch(weaken_percent)
+    if timer is not None:
+        timer.lap("weaken_multiplier", weaken_multiplier)
+
+    # Final Outgoing DMG Calculation
+    outgoing_dmg = (
+        base_dmg
+        * dmg_percent_multiplier
+        * def_multiplier
+        * res_multiplier
+        * dmg_taken_multiplier
+        * universal_dmg_reduction_multiplier
+        * weaken_multiplier
+    )
+
+    outgoing_dmg = np.asarray(outgoing_dmg, dtype=np.float64)
+    if timer is not None:
+        timer.lap("outgoing_dmg", outgoing_dmg)
+
+    if explain:
+        stages = {
+            "base_dmg": base_dmg,
+            "dmg_percent_multiplier": dmg_percent_multiplier,
+            "enemy_final_def": enemy_final_def,
+            "def_multiplier": def_multiplier,
+            "res_multiplier": res_multiplier,
+            "dmg_taken_multiplier": dmg_taken_multiplier,
+            "universal_dmg_reduction_multiplier": universal_dmg_reduction_multiplier,
+            "weaken_multiplier": weaken_multiplier,
+            "outgoing_dmg": outgoing_dmg,
+        }
+        breakdown = np.empty(outgoing_dmg.shape, dtype=DAMAGE_BREAKDOWN_DTYPE)
+        for stage, values in stages.items():
+            breakdown[stage] = values
+        return breakdown
+
+    return outgoing_dmg
+
+
+# Inputs of the attacker-side stages (Base_DMG and DMG_Percent_Multiplier) plus the
+# attacker level, which is the only attacker input the DEF multiplier needs.
+ATTACKER_PARAMETER_NAMES: Tuple[str, ...] = DAMAGE_PARAMETER_NAMES[:9]
+
+# Inputs of the enemy-side stages (3 to 8).
+ENEMY_PARAMETER_NAMES: Tuple[str, ...] = DAMAGE_ARGUMENT_NAMES[9:]
+
+
+def calculate_damage_matrix(
+    builds: Mapping[str, ArrayLike],
+    enemies: Mapping[str, ArrayLike],
+) -> np.ndarray:
+    """
+    Damage of every build against every enemy profile, computed in factorized form.
+
+    Outgoing damage is (Base_DMG * DMG_Percent_Multiplier) times the enemy-side
+    multipliers, and only the DEF multiplier couples the two through the
+    attacker level. The attacker side is computed once per build, the RES, DMG
+    taken, universal reduction and weaken multipliers once per enemy, and the
+    DEF multiplier once per (distinct attacker level, enemy) pair; the N x M
+    result is then their outer product.
+
+    Results agree with calculate_outgoing_damage to within floating-point
+    rounding (the multiplications are associated differently).
+
+    Args:
+        builds: Arrays of length N (or scalars) for every name in ATTACKER_PARAMETER_NAMES.
+        enemies: Arrays of length M (or scalars) for every name in ENEMY_PARAMETER_NAMES.
+            universal_dmg_reduction_sources follows calculate_outgoing_damage_batch.
+
+    Returns:
+        A float64 array of shape (N, M).
+    """
+    missing = [name for name in ATTACKER_PARAMETER_NAMES if name not in builds]
+    missing += [name for name in ENEMY_PARAMETER_NAMES if name not in enemies]
+    if missing:
+        raise ValueError(f"Missing parameters: {', '.join(missing)}")
+
+    build_columns = np.broadcast_arrays(*(_as_float_array(builds[name]) for name in ATTACKER_PARAMETER_NAMES))
+    (
+        skill_multiplier,
+        scaling_attribute_value,
+        extra_multiplier,
+        extra_dmg,
+        elemental_dmg_bonus_percent,
+        all_type_dmg_bonus_percent,
+        dot_dmg_bonus_percent,
+        other_dmg_bonus_percent,
+        attacker_level,
+    ) = (np.atleast_1d(column) for column in build_columns)
+
+    # Attacker side: 1. Base_DMG * 2. DMG_Percent_Multiplier
+    attacker_side = calculate_base_dmg_batch(
+        skill_multiplier, scaling_attribute_value, extra_multiplier, extra_dmg
+    ) * calculate_dmg_percent_multiplier_batch(
+        elemental_dmg_bonus_percent, all_type_dmg_bonus_percent, dot_dmg_bonus_percent, other_dmg_bonus_percent
+    )
+
+    enemy_columns = {
+        name: _as_float_array(enemies[name])
+        for name in ENEMY_PARAMETER_NAMES
+        if name != "universal_dmg_reduction_sources"
+    }
+    universal_dmg_reduction_multiplier = calculate_universal_dmg_reduction_multiplier_batch(
+        enemies["universal_dmg_reduction_sources"]
+    )
+    enemy_shape = np.broadcast_shapes(
+        *(column.shape for column in enemy_columns.values()), universal_dmg_reduction_multiplier.shape
+    )
+    enemy_columns = {name: np.broadcast_to(column, enemy_shape).reshape(-1) for name, column in enemy_columns.items()}
+    universal_dmg_reduction_multiplier = np.broadcast_to(universal_dmg_reduction_multiplier, enemy_shape).reshape(-1)
+
+    # 3. Enemy_Final_DEF
+    enemy_final_def = calculate_enemy_final_def_batch(
+        enemy_columns["enemy_base_def"],
+        enemy_columns["enemy_def_percent_buffs_debuffs"],
+        enemy_columns["def_reduction_percent"],
+        enemy_columns["def_ignore_percent"],
+    )
+
+    # 5.-8. Enemy-side multipliers that do not depend on the attacker
+    res_multiplier = calculate_res_multiplier_batch(
+        enemy_columns["enemy_current_res_percent"], enemy_columns["res_pen_percent"]
+    )
+    dmg_taken_multiplier = calculate_dmg_taken_multiplier_batch(
+        enemy_columns["elemental_dmg_taken_bonus_percent"], enemy_columns["all_type_dmg_taken_bonus_percent"]
+    )
+    weaken_multiplier = calculate_weaken_multiplier_batch(enemy_columns["weaken_percent"])
+    enemy_side = res_multiplier * dmg_taken_multiplier * universal_dmg_reduction_multiplier * weaken_multiplier
+
+    # 4. DEF_Multiplier, once per distinct attacker level
+    levels, level_index = np.unique(attacker_level, return_inverse=True)
+    def_multiplier = calculate_def_multiplier_batch(enemy_final_def[np.newaxis, :], levels[:, np.newaxis])
+    enemy_side_by_level = def_multiplier * enemy_side
+
+    return attacker_side[:, np.newaxis] * enemy_side_by_level[level_index]
@@ -0,0 +1,234 @@
+import argparse
+import csv
+import itertools
+import json
+import math
+import sys
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, TextIO, Tuple
+
+from batch_calculator import DAMAGE_ARGUMENT_NAMES, DAMAGE_PARAMETER_NAMES
+from scenario_table import ScenarioTable, calculate_outgoing_damage_table
+
+# Same defaults as the interactive CLI; every other parameter is required.
+DAMAGE_PARAMETER_DEFAULTS: Dict[str, object] = {
+    "extra_multiplier": 0.0,
+    "extra_dmg": 0.0,
+    "all_type_dmg_bonus_percent": 0.0,
+    "dot_dmg_bonus_percent": 0.0,
+    "other_dmg_bonus_percent": 0.0,
+    "enemy_def_percent_buffs_debuffs": 0.0,
+    "def_reduction_percent": 0.0,
+    "def_ignore_percent": 0.0,
+    "res_pen_percent": 0.0,
+    "elemental_dmg_taken_bonus_percent": 0.0,
+    "all_type_dmg_taken_bonus_percent": 0.0,
+    "universal_dmg_reduction_sources": [0.1],
+    "weaken_percent": 0.0,
+}
+
+# CSV cells are already comma-separated, so reduction source lists use ';' (e.g. "0.1;0.05").
+CSV_LIST_SEPARATOR = ";"
+
+
+class ScenarioInputError(ValueError):
+    """Raised when an input record cannot be turned into a scenario."""
+
+
+def _checked_number(name: str, value: object, line_number: int) -> float:
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+        raise ScenarioInputError(f"line {line_number}: {name} must be a finite number, got {value!r}")
+    return value
+
+
+def _complete_record(record: Dict[str, object], line_number: int) -> Dict[str, object]:
+    unknown = [name for name in record if name not in DAMAGE_ARGUMENT_NAMES and name != "id"]
+    if unknown:
+        raise ScenarioInputError(f"line {line_number}: unknown {', '.join(unknown)}")
+    completed = dict(DAMAGE_PARAMETER_DEFAULTS)
+    completed.update(record)
+    missing = [name for name in DAMAGE_PARAMETER_NAMES if name not in completed]
+    if missing:
+        raise ScenarioInputError(f"line {line_number}: missing {', '.join(missing)}")
+
+    for name in DAMAGE_PARAMETER_NAMES:
+        value = _checked_number(name, completed[name], line_number)
+        if name == "attacker_level":
+            if value != int(value):
+                raise ScenarioInputError(f"line {line_number}: attacker_level must be an integer, got {value!r}")
+            value = int(value)
+        completed[name] = value
+    sources = completed["universal_dmg_reduction_sources"]
+    if not isinstance(sources, list):
+        raise ScenarioInputError(f"line {line_number}: universal_dmg_reduction_sources must be a list")
+    completed["universal_dmg_reduction_sources"] = [
+        _checked_number("universal_dmg_reduction_sources", source, line_number) for source in sources
+    ]
+    return completed
+
+
+def read_ndjson_records(stream: TextIO) -> Iterator[Tuple[int, Dict[str, object]]]:
+    """
+    Yields (line number, record) for each non-blank line of an NDJSON stream.
+    """
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as error:
+            raise ScenarioInputError(f"line {line_number}: {error.msg}") from None
+        if not isinstance(record, dict):
+            raise ScenarioInputError(f"line {line_number}: expected a JSON object")
+        yield line_number, _complete_record(record, line_number)
+
+
+def read_csv_records(stream: TextIO) -> Iterator[Tuple[int, Dict[str, object]]]:
+    """
+    Yields (line number, record) for each row of a CSV stream with a header row.
+
+    Empty cells fall back to the defaults, except universal_dmg_reduction_sources: it
+    is a ';'-separated list and an empty cell means no sources. Leave the column out
+    to use its default.
+    """
+    reader = csv.DictReader(stream)
+    for row in reader:
+        line_number = reader.line_num
+        record: Dict[str, object] = {}
+        try:
+            for name, cell in row.items():
+                if name is None or cell is None:
+                    continue
+                if name == "universal_dmg_reduction_sources":
+                    record[name] = [float(item) for item in cell.split(CSV_LIST_SEPARATOR) if item.strip()]
+                elif cell == "":
+                    continue
+                elif name == "attacker_level":
+                    record[name] = int(cell)
+                elif name in DAMAGE_PARAMETER_NAMES:
+                    record[name] = float(cell)
+                else:
+                    record[name] = cell
+        except ValueError as error:
+            raise ScenarioInputError(f"line {line_number}: {error}") from None
+        yield line_number, _complete_record(record, line_number)
+
+
+def iter_scenario_chunks(
+    records: Iterable[Tuple[int, Dict[str, object]]], chunk_size: int
+) -> Iterator[Tuple[ScenarioTable, List[object]]]:
+    """
+    Groups records into ScenarioTables of at most chunk_size rows.
+
+    Yields each table with the records' "id" values (None where absent) so they
+    can be echoed next to the results.
+    """
+    iterator = iter(records)
+    while True:
+        chunk = list(itertools.islice(iterator, chunk_size))
+        if not chunk:
+            return
+        try:
+            table = ScenarioTable.from_records(record for _, record in chunk)
+        except (TypeError, ValueError) as error:
+            # Rebuild row by row to point at the offending line.
+            for line_number, record in chunk:
+                try:
+                    ScenarioTable.from_records([record])
+                except (TypeError, ValueError) as row_error:
+                    raise ScenarioInputError(f"line {line_number}: {row_error}") from None
+            raise ScenarioInputError(f"lines {chunk[0][0]}-{chunk[-1][0]}: {error}") from None
+        yield table, [record.get("id") for _, record in chunk]
+
+
+def _format_chunk(damages: Sequence[float], ids: Sequence[object], output_format: str, include_ids: bool) -> str:
+    if output_format == "ndjson":
+        if include_ids:
+            lines = [json.dumps({"id": record_id, "damage": damage}) for record_id, damage in zip(ids, damages)]
+        else:
+            lines = [json.dumps({"damage": damage}) for damage in damages]
+    elif include_ids:
+        lines = [f"{'' if record_id is None else record_id},{damage!r}" for record_id, damage in zip(ids, damages)]
+    else:
+        lines = [repr(damage) for damage in damages]
+    return "\n".join(lines) + "\n"
+
+
+def run_batch(
+    input_stream: TextIO,
+    output_stream: TextIO,
+    input_format: str = "ndjson",
+    output_format: Optional[str] = None,
+    chunk_size: int = 65536,
+) -> int:
+    """
+    Streams scenarios from input_stream, evaluates them chunk by chunk and writes results.
+
+    Only one chunk is held in memory at a time, so arbitrarily large inputs can be
+    processed in a pipeline. CSV output has a header line ("damage", or "id,damage"
+    when the first records carry an id).
+
+    Args:
+        input_stream: Text stream of NDJSON lines or CSV rows.
+        output_stream: Where results are written, one line per scenario, in input order.
+        input_format: "ndjson" or "csv".
+        output_format: "ndjson" or "csv"; defaults to input_format.
+        chunk_size: Number of scenarios evaluated per vectorized call.
+
+    Returns:
+        The number of scenarios processed.
+    """
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be positive.")
+    output_format = output_format or input_format
+    records = read_csv_records(input_stream) if input_format == "csv" else read_ndjson_records(input_stream)
+
+    processed = 0
+    include_ids = False
+    for table, ids in iter_scenario_chunks(records, chunk_size):
+        damages = calculate_outgoing_damage_table(table).tolist()
+        if processed == 0:
+            # Whether ids are echoed is decided by the first chunk so every line has the same shape.
+            include_ids = any(record_id is not None for record_id in ids)
+            if output_format == "csv":
+                output_stream.write("id,damage\n" if include_ids else "damage\n")
+        output_stream.write(_format_chunk(damages, ids, output_format, include_ids))
+        processed += len(damages)
+    output_stream.flush()
+    return processed
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="damage_calculator.py batch",
+        description="Evaluate calculate_outgoing_damage for a stream of scenarios.",
+    )
+    parser.add_argument("input", nargs="?", default="-", help="Input file (default: '-' for stdin).")
+    parser.add_argument("--format", dest="input_format", choices=["ndjson", "csv"], default="ndjson")
+    parser.add_argument("--output-format", choices=["ndjson", "csv"], default=None)
+    parser.add_argument("--chunk-size", type=int, default=65536)
+    args = parser.parse_args(argv)
+
+    if args.input == "-":
+        input_stream = sys.stdin
+    else:
+        try:
+            input_stream = open(args.input, newline="")
+        except OSError as error:
+            print(f"Cannot read input: {error}", file=sys.stderr)
+            return 1
+    try:
+        run_batch(input_stream, sys.stdout, args.input_format, args.output_format, args.chunk_size)
+    except ScenarioInputError as error:
+        print(f"Invalid input: {error}", file=sys.stderr)
+        return 1
+    except BrokenPipeError:
+        # Downstream consumer (e.g. `head`) closed the pipe; stop quietly.
+        sys.stderr.close()
+        return 0
+    finally:
+        if input_stream is not sys.stdin:
+            input_stream.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
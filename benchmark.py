@@ -0,0 +1,223 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import timeit
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from batch_calculator import calculate_outgoing_damage_batch
+from damage_calculator import (
+    calculate_outgoing_damage,
+    calculate_total_atk,
+    calculate_total_def,
+    calculate_total_hp,
+)
+from sweep import run_sweep
+
+# Tingyun Example 1 from run_prydwen_examples.
+SCALAR_DAMAGE_KWARGS: Dict[str, object] = {
+    "skill_multiplier": 0.6,
+    "scaling_attribute_value": 1062,
+    "extra_multiplier": 0.0,
+    "extra_dmg": 0.0,
+    "elemental_dmg_bonus_percent": 0.258,
+    "all_type_dmg_bonus_percent": 0.0,
+    "dot_dmg_bonus_percent": 0.0,
+    "other_dmg_bonus_percent": 0.1,
+    "attacker_level": 50,
+    "enemy_base_def": 700.0,
+    "enemy_def_percent_buffs_debuffs": 0.0,
+    "def_reduction_percent": 0.0,
+    "def_ignore_percent": 0.0,
+    "enemy_current_res_percent": 0.2,
+    "res_pen_percent": 0.0,
+    "elemental_dmg_taken_bonus_percent": 0.0,
+    "all_type_dmg_taken_bonus_percent": 0.0,
+    "universal_dmg_reduction_sources": [0.1],
+    "weaken_percent": 0.0,
+}
+
+# Parameters that vary per row in the batch and sweep benchmarks; the rest are broadcast scalars.
+VARYING_PARAMETERS = (
+    "scaling_attribute_value",
+    "elemental_dmg_bonus_percent",
+    "def_reduction_percent",
+    "res_pen_percent",
+)
+
+DEFAULT_BATCH_SIZES = (1_000, 1_000_000, 10_000_000)
+DEFAULT_REGRESSION_THRESHOLD = 0.10
+
+
+def _result(name: str, value: float, unit: str, higher_is_better: bool) -> Dict[str, object]:
+    return {"name": name, "value": value, "unit": unit, "higher_is_better": higher_is_better}
+
+
+def _per_call_ns(function: Callable[[], object], repeat: int) -> float:
+    timer = timeit.Timer(function)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number * 1e9
+
+
+def benchmark_scalar(repeat: int = 5) -> List[Dict[str, object]]:
+    """
+    Per-call latency (best of `repeat`) of the scalar damage and stat functions.
+    """
+    kwargs = SCALAR_DAMAGE_KWARGS
+    cases = {
+        "calculate_outgoing_damage": lambda: calculate_outgoing_damage(**kwargs),
+        "calculate_total_atk": lambda: calculate_total_atk(756.0, 529.2, 0.48, 352.0),
+        "calculate_total_hp": lambda: calculate_total_hp(1047.0, 1058.4, 0.432, 705.0),
+        "calculate_total_def": lambda: calculate_total_def(485.1, 463.05, 0.54, 50.0),
+    }
+    return [
+        _result(f"scalar.{name}", _per_call_ns(function, repeat), "ns/call", higher_is_better=False)
+        for name, function in cases.items()
+    ]
+
+
+def _batch_inputs(rows: int, seed: int = 0) -> Dict[str, object]:
+    rng = np.random.default_rng(seed)
+    kwargs = dict(SCALAR_DAMAGE_KWARGS)
+    kwargs["scaling_attribute_value"] = rng.uniform(1000.0, 4000.0, rows)
+    kwargs["elemental_dmg_bonus_percent"] = rng.uniform(0.0, 0.8, rows)
+    kwargs["def_reduction_percent"] = rng.uniform(0.0, 0.6, rows)
+    kwargs["res_pen_percent"] = rng.uniform(0.0, 0.4, rows)
+    return kwargs
+
+
+def benchmark_batch(sizes: Sequence[int] = DEFAULT_BATCH_SIZES, repeat: int = 3) -> List[Dict[str, object]]:
+    """
+    Throughput of calculate_outgoing_damage_batch in rows per second at each batch size.
+    """
+    results = []
+    for rows in sizes:
+        kwargs = _batch_inputs(rows)
+        best = min(timeit.repeat(lambda: calculate_outgoing_damage_batch(**kwargs), repeat=repeat, number=1))
+        results.append(_result(f"batch.rows_per_second.{rows}", rows / best, "rows/s", higher_is_better=True))
+    return results
+
+
+def benchmark_sweep(
+    worker_counts: Optional[Sequence[int]] = None, grid_points: int = 4_000_000
+) -> List[Dict[str, object]]:
+    """
+    Throughput of run_sweep for each worker count, plus speedup relative to one worker.
+    """
+    if worker_counts is None:
+        cpus = os.cpu_count() or 1
+        worker_counts = sorted({1, 2, 4, 8, 16, 32, 64, cpus} & set(range(1, cpus + 1)))
+    side = max(int(round(grid_points ** 0.25)), 1)
+    axes = {
+        "scaling_attribute_value": np.linspace(1000.0, 4000.0, side),
+        "elemental_dmg_bonus_percent": np.linspace(0.0, 0.8, side),
+        "def_reduction_percent": np.linspace(0.0, 0.6, side),
+        "res_pen_percent": np.linspace(0.0, 0.4, side),
+    }
+    fixed = {name: value for name, value in SCALAR_DAMAGE_KWARGS.items() if name not in axes}
+    total = side ** 4
+
+    results = []
+    single_worker_rate = None
+    for workers in worker_counts:
+        start = time.perf_counter()
+        run_sweep(axes, fixed, workers=workers)
+        rate = total / (time.perf_counter() - start)
+        results.append(_result(f"sweep.rows_per_second.workers_{workers}", rate, "rows/s", higher_is_better=True))
+        if workers == 1:
+            single_worker_rate = rate
+        elif single_worker_rate:
+            results.append(
+                _result(f"sweep.speedup.workers_{workers}", rate / single_worker_rate, "x", higher_is_better=True)
+            )
+    return results
+
+
+def compare_to_baseline(
+    results: Sequence[Dict[str, object]],
+    baseline: Sequence[Dict[str, object]],
+    threshold: float = DEFAULT_REGRESSION_THRESHOLD,
+) -> List[Dict[str, object]]:
+    """
+    Returns the results that are worse than the baseline by more than `threshold`.
+
+    Each entry holds the name, baseline and current values and the relative change
+    (positive means worse). Benchmarks missing from either side are ignored.
+    """
+    baseline_by_name = {entry["name"]: entry for entry in baseline}
+    regressions = []
+    for entry in results:
+        reference = baseline_by_name.get(entry["name"])
+        if reference is None or not reference["value"]:
+            continue
+        change = (entry["value"] - reference["value"]) / reference["value"]
+        worse_by = -change if entry["higher_is_better"] else change
+        if worse_by > threshold:
+            regressions.append(
+                {
+                    "name": entry["name"],
+                    "baseline": reference["value"],
+                    "current": entry["value"],
+                    "worse_by": worse_by,
+                }
+            )
+    return regressions
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for the damage and stat functions.")
+    parser.add_argument("--suites", default="scalar,batch,sweep", help="Comma-separated: scalar,batch,sweep.")
+    parser.add_argument("--sizes", default=",".join(str(size) for size in DEFAULT_BATCH_SIZES))
+    parser.add_argument("--workers", default=None, help="Comma-separated worker counts for the sweep suite.")
+    parser.add_argument("--sweep-points", type=int, default=4_000_000)
+    parser.add_argument("--output", default="-", help="Where to write the JSON report (default: stdout).")
+    parser.add_argument("--baseline", default=None, help="Baseline JSON report to compare against.")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_REGRESSION_THRESHOLD)
+    args = parser.parse_args(argv)
+
+    suites = {suite.strip() for suite in args.suites.split(",") if suite.strip()}
+    results: List[Dict[str, object]] = []
+    if "scalar" in suites:
+        results += benchmark_scalar()
+    if "batch" in suites:
+        results += benchmark_batch([int(size) for size in args.sizes.split(",")])
+    if "sweep" in suites:
+        workers = [int(count) for count in args.workers.split(",")] if args.workers else None
+        results += benchmark_sweep(workers, args.sweep_points)
+
+    report: Dict[str, object] = {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "results": results,
+    }
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)["results"]
+        regressions = compare_to_baseline(results, baseline, args.threshold)
+        report["threshold"] = args.threshold
+        report["regressions"] = regressions
+        for regression in regressions:
+            print(
+                f"Regression: {regression['name']} is {regression['worse_by']:.1%} worse than baseline",
+                file=sys.stderr,
+            )
+        exit_code = 1 if regressions else 0
+
+    text = json.dumps(report, indent=2)
+    if args.output == "-":
+        print(text)
+    else:
+        with open(args.output, "w") as output_file:
+            output_file.write(text + "\n")
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
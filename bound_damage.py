@@ -0,0 +1,148 @@
+from typing import Callable, Dict, Mapping, Tuple
+
+import numpy as np
+
+import batch_calculator
+from batch_calculator import DAMAGE_ARGUMENT_NAMES
+
+# (stage name, inputs, scalar code, vectorized code). Each snippet assigns the stage's
+# multiplier to a local of the same name; fixed inputs are visible to it as globals. The
+# vectorized snippets call the calculate_*_batch stage functions of batch_calculator.
+_STAGES: Tuple[Tuple[str, Tuple[str, ...], str, str], ...] = (
+    (
+        "base_dmg",
+        ("skill_multiplier", "scaling_attribute_value", "extra_multiplier", "extra_dmg"),
+        "base_dmg = (skill_multiplier + extra_multiplier) * scaling_attribute_value + extra_dmg",
+        "base_dmg = calculate_base_dmg_batch(skill_multiplier, scaling_attribute_value, extra_multiplier, extra_dmg)",
+    ),
+    (
+        "dmg_percent_multiplier",
+        ("elemental_dmg_bonus_percent", "all_type_dmg_bonus_percent", "dot_dmg_bonus_percent", "other_dmg_bonus_percent"),
+        "dmg_percent_multiplier = 1 + elemental_dmg_bonus_percent + all_type_dmg_bonus_percent"
+        " + dot_dmg_bonus_percent + other_dmg_bonus_percent",
+        "dmg_percent_multiplier = calculate_dmg_percent_multiplier_batch(elemental_dmg_bonus_percent,"
+        " all_type_dmg_bonus_percent, dot_dmg_bonus_percent, other_dmg_bonus_percent)",
+    ),
+    (
+        "def_multiplier",
+        ("attacker_level", "enemy_base_def", "enemy_def_percent_buffs_debuffs", "def_reduction_percent", "def_ignore_percent"),
+        "enemy_final_def = max(0, enemy_base_def * (1 + enemy_def_percent_buffs_debuffs"
+        " - (def_reduction_percent + def_ignore_percent)))\n"
+        "def_multiplier_denominator = enemy_final_def + 200 + (10 * attacker_level)\n"
+        "def_multiplier = 1 if def_multiplier_denominator == 0 else 1 - (enemy_final_def / def_multiplier_denominator)",
+        "enemy_final_def = calculate_enemy_final_def_batch(enemy_base_def, enemy_def_percent_buffs_debuffs,"
+        " def_reduction_percent, def_ignore_percent)\n"
+        "def_multiplier = calculate_def_multiplier_batch(enemy_final_def, attacker_level)",
+    ),
+    (
+        "res_multiplier",
+        ("enemy_current_res_percent", "res_pen_percent"),
+        "res_multiplier = 1 - max(-1.0, min(0.9, enemy_current_res_percent - res_pen_percent))",
+        "res_multiplier = calculate_res_multiplier_batch(enemy_current_res_percent, res_pen_percent)",
+    ),
+    (
+        "dmg_taken_multiplier",
+        ("elemental_dmg_taken_bonus_percent", "all_type_dmg_taken_bonus_percent"),
+        "dmg_taken_multiplier = 1 + elemental_dmg_taken_bonus_percent + all_type_dmg_taken_bonus_percent",
+        "dmg_taken_multiplier = calculate_dmg_taken_multiplier_batch(elemental_dmg_taken_bonus_percent,"
+        " all_type_dmg_taken_bonus_percent)",
+    ),
+    (
+        "universal_dmg_reduction_multiplier",
+        ("universal_dmg_reduction_sources",),
+        "universal_dmg_reduction_multiplier = 1.0\n"
+        "for reduction_source in universal_dmg_reduction_sources:\n"
+        "    universal_dmg_reduction_multiplier *= (1 - reduction_source)",
+        "universal_dmg_reduction_multiplier = calculate_universal_dmg_reduction_multiplier_batch("
+        "universal_dmg_reduction_sources)",
+    ),
+    (
+        "weaken_multiplier",
+        ("weaken_percent",),
+        "weaken_multiplier = 1 - weaken_percent",
+        "weaken_multiplier = calculate_weaken_multiplier_batch(weaken_percent)",
+    ),
+)
+
+
+# The batch stage functions the vectorized snippets call.
+_BATCH_STAGE_FUNCTIONS: Tuple[str, ...] = (
+    "calculate_base_dmg_batch",
+    "calculate_dmg_percent_multiplier_batch",
+    "calculate_enemy_final_def_batch",
+    "calculate_def_multiplier_batch",
+    "calculate_res_multiplier_batch",
+    "calculate_dmg_taken_multiplier_batch",
+    "calculate_universal_dmg_reduction_multiplier_batch",
+    "calculate_weaken_multiplier_batch",
+)
+
+
+def _indent(code: str) -> str:
+    return "\n".join("    " + line for line in code.splitlines())
+
+
+def _as_vector_input(name: str, value: object) -> object:
+    if name == "universal_dmg_reduction_sources":
+        return value
+    return np.asarray(value, dtype=np.float64)
+
+
+def bind_outgoing_damage(fixed: Mapping[str, object], vectorized: bool = False) -> Callable[..., float]:
+    """
+    Partially evaluates calculate_outgoing_damage for a set of fixed parameters.
+
+    Every stage whose inputs are all fixed (typically DEF, RES, DMG taken,
+    universal reduction and weaken) is computed once and folded into a single
+    constant. The returned function takes only the remaining free parameters,
+    in calculate_outgoing_damage order (positionally or by keyword), and
+    evaluates just the stages that depend on them.
+
+    Because the folded stages are multiplied together before the varying ones,
+    results can differ from calculate_outgoing_damage in the last few ulps.
+
+    Args:
+        fixed: Values for any subset of calculate_outgoing_damage's parameters.
+        vectorized: If True, the returned function accepts NumPy arrays for its free
+            parameters (as in calculate_outgoing_damage_batch) and returns a float64 array.
+
+    Returns:
+        The specialized damage function. It exposes `free_parameters` (argument names),
+        `fixed` (the bound values) and `constant` (the product of all folded stages).
+    """
+    unknown = [name for name in fixed if name not in DAMAGE_ARGUMENT_NAMES]
+    if unknown:
+        raise ValueError(f"Unknown parameters: {', '.join(unknown)}")
+
+    free_parameters = tuple(name for name in DAMAGE_ARGUMENT_NAMES if name not in fixed)
+    namespace: Dict[str, object] = {"_np": np}
+    if vectorized:
+        namespace.update((name, getattr(batch_calculator, name)) for name in _BATCH_STAGE_FUNCTIONS)
+        namespace.update((name, _as_vector_input(name, value)) for name, value in fixed.items())
+    else:
+        namespace.update(fixed)
+
+    constant = 1.0
+    varying_stages = []
+    for stage_name, inputs, scalar_code, vector_code in _STAGES:
+        code = vector_code if vectorized else scalar_code
+        if any(name in free_parameters for name in inputs):
+            varying_stages.append((stage_name, code))
+        else:
+            stage_locals: Dict[str, object] = {}
+            exec(code, dict(namespace), stage_locals)
+            constant = constant * stage_locals[stage_name]
+    namespace["_constant"] = constant
+
+    body = "\n".join(_indent(code) for _, code in varying_stages)
+    product = " * ".join([stage_name for stage_name, _ in varying_stages] + ["_constant"])
+    if vectorized:
+        product = f"_np.asarray({product}, dtype=_np.float64)"
+    source = f"def bound_outgoing_damage({', '.join(free_parameters)}):\n{body}\n    return {product}\n"
+    exec(source, namespace)
+
+    bound = namespace["bound_outgoing_damage"]
+    bound.free_parameters = free_parameters
+    bound.fixed = dict(fixed)
+    bound.constant = constant
+    return bound
@@ -0,0 +1,85 @@
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Generic, Hashable, TypeVar
+
+from instrumentation import pipeline_stats
+
+V = TypeVar("V")
+
+_MISSING = object()
+
+
+class CountingLRUCache(Generic[V]):
+    """
+    Bounded LRU cache with hit, miss and eviction counters. Safe to share between threads.
+
+    The counters are also reported to pipeline_stats as "<counter_prefix>.hits",
+    "<counter_prefix>.misses" and "<counter_prefix>.evictions" while it is enabled.
+    """
+
+    def __init__(self, maxsize: int, counter_prefix: str):
+        if maxsize <= 0:
+            raise ValueError("maxsize must be positive.")
+        self.maxsize = maxsize
+        self.counter_prefix = counter_prefix
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[Hashable, V]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], V]) -> V:
+        """
+        Returns the cached value for key, calling compute() and storing its result on a miss.
+
+        compute() runs outside the lock, so concurrent misses on one key may both compute it.
+        """
+        with self._lock:
+            value = self._entries.get(key, _MISSING)
+            if value is not _MISSING:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                if pipeline_stats.enabled:
+                    pipeline_stats.increment(f"{self.counter_prefix}.hits")
+                return value
+            self.misses += 1
+        if pipeline_stats.enabled:
+            pipeline_stats.increment(f"{self.counter_prefix}.misses")
+
+        value = compute()
+
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+                if pipeline_stats.enabled:
+                    pipeline_stats.increment(f"{self.counter_prefix}.evictions")
+        return value
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def info(self) -> Dict[str, int]:
+        """
+        Returns the cache counters and current size.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+            }
+
+    def clear(self) -> None:
+        """
+        Removes every entry and resets the counters.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
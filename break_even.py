@@ -0,0 +1,126 @@
+from typing import Dict, Mapping, Optional, Sequence
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+from batch_calculator import (
+    DAMAGE_ARGUMENT_NAMES,
+    DAMAGE_PARAMETER_NAMES,
+    _as_float_array,
+    calculate_outgoing_damage_batch,
+)
+from inverse_solver import LINEAR_PARAMETER_STAGES
+from params import STAT_FUNCTIONS, STAT_INPUT_NAMES
+
+
+def _damage_arguments(
+    params: Mapping[str, object], stat_params: Optional[Mapping[str, ArrayLike]], stat: str
+) -> Dict[str, object]:
+    arguments = dict(params)
+    if stat_params is not None:
+        arguments["scaling_attribute_value"] = STAT_FUNCTIONS[stat](
+            *(_as_float_array(stat_params[name]) for name in STAT_INPUT_NAMES)
+        )
+    return arguments
+
+
+def _stage_of(parameter: str, stat_names: Sequence[str]) -> str:
+    if parameter in stat_names:
+        return "base_dmg"
+    if parameter in LINEAR_PARAMETER_STAGES:
+        return LINEAR_PARAMETER_STAGES[parameter][0]
+    return parameter
+
+
+def calculate_break_even(
+    swept: str,
+    swept_increment: float,
+    other: str,
+    other_increment: float,
+    params: Mapping[str, object],
+    stat_params: Optional[Mapping[str, ArrayLike]] = None,
+    stat: str = "atk",
+) -> np.ndarray:
+    """
+    Finds, per build, the value of `swept` at which adding swept_increment of it gains
+    exactly as much damage as adding other_increment of `other`.
+
+    Damage is a product of stages, so adding a buff multiplies damage by the ratio of
+    its own stage before and after, independent of every other stage. `swept` must be
+    a parameter its stage depends on affinely (a DMG% or DMG taken bonus, a Base_DMG
+    input or, with stat_params, a stat input such as "percent_bonus"); for such a stage
+    S with slope k the gain is (S + k * increment) / S, which equals the other buff's
+    gain R at S = k * increment / (R - 1). Above the returned value, the other buff is
+    the better of the two, e.g. with swept="percent_bonus" and
+    other="def_reduction_percent" it is the ATK% after which DEF shred overtakes ATK%.
+
+    Args:
+        swept: The parameter whose break-even value is returned.
+        swept_increment: The amount of `swept` being compared (e.g. 0.1 for 10% ATK).
+        other: The parameter it is compared against, any damage parameter or stat input
+            outside swept's stage.
+        other_increment: The amount of `other` being compared.
+        params: Every calculate_outgoing_damage_batch argument (scalars or arrays, one
+            row per build). scaling_attribute_value may be omitted if stat_params is given.
+        stat_params: Optional "char_base", "lc_base", "percent_bonus" and "flat_bonus"
+            arrays; the total stat computed from them is used as scaling_attribute_value.
+        stat: The stat stat_params describe, "atk", "hp" or "def".
+
+    Returns:
+        A float64 array of break-even values of `swept` with the broadcast shape of the
+        inputs. NaN where the other buff does not increase damage or no break-even exists.
+    """
+    if stat not in STAT_FUNCTIONS:
+        raise ValueError("stat must be 'atk', 'hp' or 'def'.")
+    stat_names = STAT_INPUT_NAMES if stat_params is not None else ()
+    if swept not in LINEAR_PARAMETER_STAGES and swept not in stat_names:
+        raise ValueError(f"Cannot sweep '{swept}'; it must be an affine damage parameter or a stat input.")
+    if other not in DAMAGE_PARAMETER_NAMES and other not in stat_names:
+        raise ValueError(f"Unknown parameter '{other}'.")
+    if _stage_of(swept, stat_names) == _stage_of(other, stat_names):
+        raise ValueError(f"'{swept}' and '{other}' are in the same stage, so their gains have no break-even.")
+    required = [name for name in DAMAGE_ARGUMENT_NAMES if not (name == "scaling_attribute_value" and stat_params)]
+    missing = [name for name in required if name not in params]
+    if missing:
+        raise ValueError(f"Missing parameters: {', '.join(missing)}")
+
+    arguments = _damage_arguments(params, stat_params, stat)
+    breakdown = calculate_outgoing_damage_batch(**arguments, explain=True)
+
+    # Gain ratio of the other buff.
+    if other in stat_names:
+        buffed_stats = dict(stat_params)
+        buffed_stats[other] = _as_float_array(stat_params[other]) + other_increment
+        buffed_arguments = _damage_arguments(params, buffed_stats, stat)
+    else:
+        buffed_arguments = dict(arguments)
+        buffed_arguments[other] = _as_float_array(arguments[other]) + other_increment
+    with np.errstate(divide="ignore", invalid="ignore"):
+        other_gain = calculate_outgoing_damage_batch(**buffed_arguments) / breakdown["outgoing_dmg"]
+
+    # Stage holding the swept parameter and its slope dStage/dSwept.
+    skill_total = _as_float_array(arguments["skill_multiplier"]) + _as_float_array(arguments["extra_multiplier"])
+    if swept in stat_names:
+        stage = "base_dmg"
+        char_base, lc_base, percent_bonus, _ = (_as_float_array(stat_params[name]) for name in STAT_INPUT_NAMES)
+        stat_slopes = {
+            "char_base": 1 + percent_bonus,
+            "lc_base": 1 + percent_bonus,
+            "percent_bonus": char_base + lc_base,
+            "flat_bonus": 1.0,
+        }
+        slope = skill_total * stat_slopes[swept]
+        current = _as_float_array(stat_params[swept])
+    else:
+        stage, slope_parameters, sign = LINEAR_PARAMETER_STAGES[swept]
+        if slope_parameters is None:
+            slope = sign
+        else:
+            slope = sign * sum(_as_float_array(arguments[name]) for name in slope_parameters)
+        current = _as_float_array(arguments[swept])
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        break_even_stage = slope * swept_increment / (other_gain - 1)
+        break_even = current + (break_even_stage - breakdown[stage]) / slope
+    valid = np.isfinite(break_even) & (break_even_stage > 0)
+    return np.where(valid, break_even, np.nan)
@@ -0,0 +1,110 @@
+import math
+from typing import Dict, NamedTuple, Sequence
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+from batch_calculator import _as_float_array
+
+class CritDamageDistribution(NamedTuple):
+    """
+    Summary of a multi-hit skill's total damage over the number of crits.
+
+    Every field has the broadcast shape of the inputs; percentiles maps each requested
+    percentile to an array of total damage values.
+    """
+
+    mean: np.ndarray
+    std: np.ndarray
+    percentiles: Dict[float, np.ndarray]
+
+
+def _clamp_crit_rate(crit_rate: ArrayLike) -> np.ndarray:
+    # Crit rate above 100% (or below 0%) has no further effect.
+    return np.clip(_as_float_array(crit_rate), 0.0, 1.0)
+
+
+def calculate_expected_damage(non_crit_damage: ArrayLike, crit_rate: ArrayLike, crit_dmg: ArrayLike) -> np.ndarray:
+    """
+    Calculates the expected damage including crits.
+
+    Formula: Expected_DMG = Non_Crit_DMG * (1 + Crit_Rate * Crit_DMG)
+
+    Args:
+        non_crit_damage: The damage without a crit (e.g. from calculate_outgoing_damage_batch).
+        crit_rate: The crit rate (e.g. 0.7 for 70%), clamped to [0, 1].
+        crit_dmg: The crit damage bonus (e.g. 1.5 for 150%).
+
+    Returns:
+        A float64 array of expected damage with the broadcast shape of the inputs.
+    """
+    return _as_float_array(non_crit_damage) * (1 + _clamp_crit_rate(crit_rate) * _as_float_array(crit_dmg))
+
+
+def calculate_crit_count_probabilities(crit_rate: ArrayLike, hits: int) -> np.ndarray:
+    """
+    Returns the exact binomial probabilities of 0..hits crits, each hit rolling independently.
+
+    Args:
+        crit_rate: The crit rate, clamped to [0, 1].
+        hits: The number of hits.
+
+    Returns:
+        A float64 array with crit_rate's shape plus a trailing axis of length hits + 1.
+    """
+    if hits < 1:
+        raise ValueError("hits must be at least 1.")
+    crit_rate = _clamp_crit_rate(crit_rate)[..., np.newaxis]
+    crits = np.arange(hits + 1)
+    combinations = np.array([math.comb(hits, count) for count in crits], dtype=np.float64)
+    return combinations * np.power(crit_rate, crits) * np.power(1 - crit_rate, hits - crits)
+
+
+def calculate_crit_damage_distribution(
+    non_crit_damage: ArrayLike,
+    crit_rate: ArrayLike,
+    crit_dmg: ArrayLike,
+    hits: int,
+    percentiles: Sequence[float] = (10, 50, 90),
+) -> CritDamageDistribution:
+    """
+    Calculates the exact total damage distribution of a skill whose damage is split
+    evenly across `hits` hits that crit independently.
+
+    With k crits the total is Non_Crit_DMG * (1 + Crit_DMG * k / hits) and k is
+    binomial(hits, Crit_Rate), so the mean, standard deviation and percentiles are
+    exact and need no sampling.
+
+    Args:
+        non_crit_damage: The skill's total damage without crits, over all hits.
+        crit_rate: The crit rate, clamped to [0, 1].
+        crit_dmg: The crit damage bonus.
+        hits: The number of hits.
+        percentiles: Percentiles to report, between 0 and 100. Each is the smallest total
+            whose cumulative probability reaches it.
+
+    Returns:
+        A CritDamageDistribution.
+    """
+    if any(not 0 <= percentile <= 100 for percentile in percentiles):
+        raise ValueError("percentiles must be between 0 and 100.")
+    non_crit_damage = _as_float_array(non_crit_damage)
+    crit_dmg = _as_float_array(crit_dmg)
+    crit_rate = _clamp_crit_rate(crit_rate)
+    shape = np.broadcast_shapes(non_crit_damage.shape, crit_rate.shape, crit_dmg.shape)
+
+    mean = calculate_expected_damage(non_crit_damage, crit_rate, crit_dmg)
+    # Var(k) = hits * p * (1 - p) and each crit adds Non_Crit_DMG * Crit_DMG / hits.
+    std = non_crit_damage * crit_dmg * np.sqrt(hits * crit_rate * (1 - crit_rate)) / hits
+    mean = np.broadcast_to(mean, shape)
+    std = np.broadcast_to(std, shape)
+
+    cumulative = np.cumsum(calculate_crit_count_probabilities(crit_rate, hits), axis=-1)
+    results: Dict[float, np.ndarray] = {}
+    for percentile in percentiles:
+        # The tolerance and clip absorb rounding in the cumulative sums.
+        crit_count = np.minimum(np.sum(cumulative < percentile / 100 - 1e-12, axis=-1), hits)
+        results[percentile] = np.broadcast_to(
+            non_crit_damage * (1 + crit_dmg * crit_count / hits), shape
+        )
+    return CritDamageDistribution(mean, std, results)
@@ -1,6 +1,8 @@
 from typing import List, Callable
 import math # For math.isclose or abs for assertions
 
+from instrumentation import pipeline_stats
+
 def calculate_outgoing_damage(
     skill_multiplier: float,
     scaling_attribute_value: float,
@@ -49,9 +51,12 @@ def calculate_outgoing_damage(
     Returns:
         The final calculated outgoing damage.
     """
+    timer = pipeline_stats.stage_timer("scalar") if pipeline_stats.enabled else None
 
     # 1. Base_DMG
     base_dmg = (skill_multiplier + extra_multiplier) * scaling_attribute_value + extra_dmg
+    if timer is not None:
+        timer.lap("base_dmg", base_dmg)
 
     # 2. DMG_Percent_Multiplier
     dmg_percent_multiplier = (
@@ -61,12 +66,16 @@ def calculate_outgoing_damage(
         + dot_dmg_bonus_percent
         + other_dmg_bonus_percent
     )
+    if timer is not None:
+        timer.lap("dmg_percent_multiplier", dmg_percent_multiplier)
 
     # 3. Enemy_Final_DEF
     enemy_final_def = enemy_base_def * (
         1 + enemy_def_percent_buffs_debuffs - (def_reduction_percent + def_ignore_percent)
     )
     enemy_final_def = max(0, enemy_final_def)  # DEF cannot go below 0
+    if timer is not None:
+        timer.lap("enemy_final_def", enemy_final_def)
 
     # 4. DEF_Multiplier
     # Using Prydwen formula: DEF Multiplier = 1 - [Enemy_Final_DEF / (Enemy_Final_DEF + 200 + 10 * Attacker_Level)]
@@ -75,6 +84,8 @@ def calculate_outgoing_damage(
         def_multiplier = 1
     else:
         def_multiplier = 1 - (enemy_final_def / def_multiplier_denominator)
+    if timer is not None:
+        timer.lap("def_multiplier", def_multiplier)
 
 
     # 5. RES_Multiplier
@@ -83,19 +94,27 @@ def calculate_outgoing_damage(
     effective_res = enemy_current_res_percent - res_pen_percent
     clamped_effective_res = max(-1.0, min(0.9, effective_res))
     res_multiplier = 1 - clamped_effective_res
+    if timer is not None:
+        timer.lap("res_multiplier", res_multiplier)
 
     # 6. DMG_Taken_Multiplier
     dmg_taken_multiplier = (
         1 + elemental_dmg_taken_bonus_percent + all_type_dmg_taken_bonus_percent
     )
+    if timer is not None:
+        timer.lap("dmg_taken_multiplier", dmg_taken_multiplier)
 
     # 7. Universal_DMG_Reduction_Multiplier
     universal_dmg_reduction_multiplier = 1.0
     for reduction_source in universal_dmg_reduction_sources:
         universal_dmg_reduction_multiplier *= (1 - reduction_source)
+    if timer is not None:
+        timer.lap("universal_dmg_reduction_multiplier", universal_dmg_reduction_multiplier)
 
     # 8. Weaken_Multiplier
     weaken_multiplier = 1 - weaken_percent
+    if timer is not None:
+        timer.lap("weaken_multiplier", weaken_multiplier)
 
     # Final Outgoing DMG Calculation
     outgoing_dmg = (
@@ -107,6 +126,8 @@ def calculate_outgoing_damage(
         * universal_dmg_reduction_multiplier
         * weaken_multiplier
     )
+    if timer is not None:
+        timer.lap("outgoing_dmg", outgoing_dmg)
 
     return outgoing_dmg
 
@@ -390,15 +411,63 @@ def run_prydwen_examples():
     print("Prydwen Examples Complete")
     print("="*30 + "\n")
 
+def run_batch_consistency_check(rows: int = 3000, seed: int = 0):
+    """
+    Checks that calculate_outgoing_damage_batch is bit-identical to calculate_outgoing_damage
+    on random scenarios, including a varying number of universal DMG reduction sources.
+    """
+    import random
+
+    try:
+        from batch_calculator import DAMAGE_PARAMETER_NAMES, RaggedSources, calculate_outgoing_damage_batch
+    except ImportError:
+        print("numpy is not installed, skipping the batch consistency check.")
+        return
+
+    print("\n" + "="*30)
+    print("Running Batch Consistency Check")
+    print("="*30)
+    rng = random.Random(seed)
+    scenarios = []
+    for _ in range(rows):
+        scenario = {name: rng.uniform(-0.5, 1.5) for name in DAMAGE_PARAMETER_NAMES}
+        scenario["skill_multiplier"] = rng.uniform(0.0, 5.0)
+        scenario["scaling_attribute_value"] = rng.uniform(0.0, 5000.0)
+        scenario["extra_dmg"] = rng.uniform(0.0, 1000.0)
+        scenario["attacker_level"] = rng.randint(1, 80)
+        scenario["enemy_base_def"] = rng.uniform(0.0, 1500.0)
+        scenario["universal_dmg_reduction_sources"] = [rng.uniform(0.0, 0.5) for _ in range(rng.randint(0, 4))]
+        scenarios.append(scenario)
+
+    scalar_results = [calculate_outgoing_damage(**scenario) for scenario in scenarios]
+    columns = {name: [scenario[name] for scenario in scenarios] for name in DAMAGE_PARAMETER_NAMES}
+    batch_results = calculate_outgoing_damage_batch(
+        **columns,
+        universal_dmg_reduction_sources=RaggedSources.from_lists(
+            [scenario["universal_dmg_reduction_sources"] for scenario in scenarios]
+        ),
+    )
+    mismatches = sum(1 for scalar, batch in zip(scalar_results, batch_results.tolist()) if scalar != batch)
+    print(f"Compared {rows} scenarios, {mismatches} differ.")
+    if mismatches == 0:
+        print("Test Passed")
+    else:
+        print("Test Failed. The batch kernel no longer matches calculate_outgoing_damage.")
+
 
 if __name__ == "__main__":
+    import sys
+    if len(sys.argv) > 1 and sys.argv[1] == "batch":
+        # Non-interactive streaming mode: python damage_calculator.py batch [--format csv] [file]
+        from batch_cli import main as batch_main
+        sys.exit(batch_main(sys.argv[2:]))
+
     print("Welcome to the Damage Calculator CLI!")
     
     scaling_attribute_value = 0.0
 
     # 1. Optional Stat Calculation
     # Check if sys.stdin.isatty() to see if it's an interactive session
-    import sys
     run_cli_interaction = True
     if not sys.stdin.isatty(): # If not interactive (e.g. piped input or just running script)
         # Check if any command line arguments were passed to potentially bypass CLI
@@ -499,3 +568,4 @@ if __name__ == "__main__":
     
     # Always run Prydwen examples after CLI interaction (if any)
     run_prydwen_examples()
+    run_batch_consistency_check()
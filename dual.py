@@ -0,0 +1,180 @@
+from typing import Dict, List, Mapping, Tuple, Union
+
+import numpy as np
+
+from batch_calculator import DAMAGE_ARGUMENT_NAMES
+from damage_calculator import calculate_outgoing_damage
+from params import STAT_FUNCTIONS, STAT_INPUT_NAMES, StatParams
+
+
+class Dual:
+    """
+    Forward-mode dual number: a value plus its partial derivatives w.r.t. every seeded input.
+
+    Supports the arithmetic and comparisons used by calculate_total_atk/hp/def and
+    calculate_outgoing_damage, so those functions evaluate Duals unchanged. Comparisons
+    only look at the value, so max()/min() clamps pick a branch like the float code
+    does; a clamp that returns a float constant has zero derivative.
+    """
+
+    __slots__ = ("value", "tangent")
+
+    def __init__(self, value: float, tangent: np.ndarray):
+        self.value = float(value)
+        self.tangent = tangent
+
+    def __repr__(self) -> str:
+        return f"Dual({self.value!r}, {self.tangent!r})"
+
+    def __float__(self) -> float:
+        return self.value
+
+    def __neg__(self) -> "Dual":
+        return Dual(-self.value, -self.tangent)
+
+    def __pos__(self) -> "Dual":
+        return self
+
+    def __add__(self, other: Union["Dual", float]) -> "Dual":
+        if isinstance(other, Dual):
+            return Dual(self.value + other.value, self.tangent + other.tangent)
+        return Dual(self.value + other, self.tangent)
+
+    __radd__ = __add__
+
+    def __sub__(self, other: Union["Dual", float]) -> "Dual":
+        if isinstance(other, Dual):
+            return Dual(self.value - other.value, self.tangent - other.tangent)
+        return Dual(self.value - other, self.tangent)
+
+    def __rsub__(self, other: float) -> "Dual":
+        return Dual(other - self.value, -self.tangent)
+
+    def __mul__(self, other: Union["Dual", float]) -> "Dual":
+        if isinstance(other, Dual):
+            return Dual(self.value * other.value, self.tangent * other.value + other.tangent * self.value)
+        return Dual(self.value * other, self.tangent * other)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other: Union["Dual", float]) -> "Dual":
+        if isinstance(other, Dual):
+            # (u / v)' = (u' * v - u * v') / v^2
+            return Dual(
+                self.value / other.value,
+                (self.tangent * other.value - other.tangent * self.value) / (other.value * other.value),
+            )
+        return Dual(self.value / other, self.tangent / other)
+
+    def __rtruediv__(self, other: float) -> "Dual":
+        return Dual(other / self.value, self.tangent * (-other / (self.value * self.value)))
+
+    @staticmethod
+    def _value_of(other: Union["Dual", float]) -> float:
+        return other.value if isinstance(other, Dual) else other
+
+    def __eq__(self, other: object) -> bool:
+        return self.value == self._value_of(other)
+
+    def __ne__(self, other: object) -> bool:
+        return self.value != self._value_of(other)
+
+    def __lt__(self, other: Union["Dual", float]) -> bool:
+        return self.value < self._value_of(other)
+
+    def __le__(self, other: Union["Dual", float]) -> bool:
+        return self.value <= self._value_of(other)
+
+    def __gt__(self, other: Union["Dual", float]) -> bool:
+        return self.value > self._value_of(other)
+
+    def __ge__(self, other: Union["Dual", float]) -> bool:
+        return self.value >= self._value_of(other)
+
+    __hash__ = None
+
+
+def seed_duals(values: Mapping[str, float]) -> Dict[str, Dual]:
+    """
+    Turns named inputs into Duals with unit tangents, one direction per input (in order).
+    """
+    identity = np.eye(len(values))
+    return {name: Dual(value, identity[position]) for position, (name, value) in enumerate(values.items())}
+
+
+def calculate_damage_sensitivities(
+    stat_params: StatParams, damage_params: Mapping[str, object]
+) -> Tuple[float, Dict[str, object]]:
+    """
+    Evaluates the stat -> damage chain once with dual numbers.
+
+    The total ATK/HP/DEF from stat_params is used as scaling_attribute_value, so the
+    result includes the sensitivities to the character base, Light Cone base,
+    percentage bonus and flat bonus as well as to every damage parameter.
+
+    Args:
+        stat_params: The scaling stat's inputs (stat_params.stat selects ATK, HP or DEF).
+        damage_params: Every calculate_outgoing_damage argument except
+            scaling_attribute_value (e.g. DamageParams.as_kwargs(); its
+            scaling_attribute_value is ignored).
+
+    Returns:
+        A (damage, sensitivities) tuple. sensitivities maps "char_base", "lc_base",
+        "percent_bonus", "flat_bonus" and every other calculate_outgoing_damage argument
+        to dDamage/dInput; universal_dmg_reduction_sources maps to a list with one
+        derivative per source.
+    """
+    if stat_params.stat not in STAT_FUNCTIONS:
+        raise ValueError("stat must be 'atk', 'hp' or 'def'.")
+    damage_names = [
+        name
+        for name in DAMAGE_ARGUMENT_NAMES
+        if name not in ("scaling_attribute_value", "universal_dmg_reduction_sources")
+    ]
+    missing = [name for name in damage_names + ["universal_dmg_reduction_sources"] if name not in damage_params]
+    if missing:
+        raise ValueError(f"Missing parameters: {', '.join(missing)}")
+
+    sources = list(damage_params["universal_dmg_reduction_sources"])
+    source_names = [f"universal_dmg_reduction_sources[{position}]" for position in range(len(sources))]
+    inputs: Dict[str, float] = {name: getattr(stat_params, name) for name in STAT_INPUT_NAMES}
+    inputs.update((name, damage_params[name]) for name in damage_names)
+    inputs.update(zip(source_names, sources))
+    duals = seed_duals(inputs)
+
+    total_stat = STAT_FUNCTIONS[stat_params.stat](*(duals[name] for name in STAT_INPUT_NAMES))
+    arguments = {name: duals[name] for name in damage_names}
+    arguments["scaling_attribute_value"] = total_stat
+    arguments["universal_dmg_reduction_sources"] = [duals[name] for name in source_names]
+    damage = calculate_outgoing_damage(**arguments)
+    if not isinstance(damage, Dual):
+        damage = Dual(damage, np.zeros(len(inputs)))
+
+    sensitivities: Dict[str, object] = {}
+    source_sensitivities: List[float] = []
+    for name, derivative in zip(inputs, damage.tangent.tolist()):
+        if name in source_names:
+            source_sensitivities.append(derivative)
+        else:
+            sensitivities[name] = derivative
+    sensitivities["universal_dmg_reduction_sources"] = source_sensitivities
+    return damage.value, sensitivities
+
+
+def calculate_damage_per_roll(
+    sensitivities: Mapping[str, object], roll_values: Mapping[str, float]
+) -> Dict[str, float]:
+    """
+    Converts sensitivities into first-order damage gained per substat roll.
+
+    Args:
+        sensitivities: The sensitivities from calculate_damage_sensitivities.
+        roll_values: The size of one roll per input, e.g. {"percent_bonus": 0.0389, "flat_bonus": 19.05}.
+
+    Returns:
+        dDamage/dInput * roll value for every input in roll_values.
+    """
+    unknown = [name for name in roll_values if name not in sensitivities]
+    if unknown:
+        raise ValueError(f"Unknown inputs: {', '.join(unknown)}")
+    return {name: sensitivities[name] * roll_value for name, roll_value in roll_values.items()}
@@ -0,0 +1,171 @@
+from typing import NamedTuple, Optional, Sequence, Tuple
+
+from bounded_cache import CountingLRUCache
+
+
+class _EnemyProfileFields(NamedTuple):
+    enemy_base_def: float
+    enemy_def_percent_buffs_debuffs: float = 0.0
+    def_reduction_percent: float = 0.0
+    def_ignore_percent: float = 0.0
+    enemy_current_res_percent: float = 0.2
+    res_pen_percent: float = 0.0
+    elemental_dmg_taken_bonus_percent: float = 0.0
+    all_type_dmg_taken_bonus_percent: float = 0.0
+    universal_dmg_reduction_sources: Tuple[float, ...] = (0.1,)
+    weaken_percent: float = 0.0
+
+
+class EnemyProfile(_EnemyProfileFields):
+    """
+    The enemy/debuff side of calculate_outgoing_damage (the inputs of stages 3 to 8).
+
+    Profiles are immutable and hashable, so they can be used as cache keys;
+    universal_dmg_reduction_sources is converted to a tuple on construction.
+    """
+
+    __slots__ = ()
+
+    def __new__(cls, *args: object, **kwargs: object) -> "EnemyProfile":
+        profile = super().__new__(cls, *args, **kwargs)
+        if not isinstance(profile.universal_dmg_reduction_sources, tuple):
+            profile = profile._replace(universal_dmg_reduction_sources=tuple(profile.universal_dmg_reduction_sources))
+        return profile
+
+    @classmethod
+    def create(cls, universal_dmg_reduction_sources: Sequence[float] = (0.1,), **kwargs: float) -> "EnemyProfile":
+        """
+        Builds a profile from keyword arguments.
+        """
+        return cls(universal_dmg_reduction_sources=universal_dmg_reduction_sources, **kwargs)
+
+    def calculate_multiplier(self, attacker_level: int) -> float:
+        """
+        Computes the combined enemy-side multiplier without using a cache.
+
+        Args:
+            attacker_level: The attacker's character level (used by the DEF multiplier).
+
+        Returns:
+            DEF_Multiplier * RES_Multiplier * DMG_Taken_Multiplier
+            * Universal_DMG_Reduction_Multiplier * Weaken_Multiplier.
+        """
+        # 3. Enemy_Final_DEF
+        enemy_final_def = self.enemy_base_def * (
+            1 + self.enemy_def_percent_buffs_debuffs - (self.def_reduction_percent + self.def_ignore_percent)
+        )
+        enemy_final_def = max(0, enemy_final_def)  # DEF cannot go below 0
+
+        # 4. DEF_Multiplier
+        def_multiplier_denominator = enemy_final_def + 200 + (10 * attacker_level)
+        if def_multiplier_denominator == 0:
+            def_multiplier = 1
+        else:
+            def_multiplier = 1 - (enemy_final_def / def_multiplier_denominator)
+
+        # 5. RES_Multiplier
+        effective_res = self.enemy_current_res_percent - self.res_pen_percent
+        res_multiplier = 1 - max(-1.0, min(0.9, effective_res))
+
+        # 6. DMG_Taken_Multiplier
+        dmg_taken_multiplier = 1 + self.elemental_dmg_taken_bonus_percent + self.all_type_dmg_taken_bonus_percent
+
+        # 7. Universal_DMG_Reduction_Multiplier
+        universal_dmg_reduction_multiplier = 1.0
+        for reduction_source in self.universal_dmg_reduction_sources:
+            universal_dmg_reduction_multiplier *= (1 - reduction_source)
+
+        # 8. Weaken_Multiplier
+        weaken_multiplier = 1 - self.weaken_percent
+
+        return (
+            def_multiplier
+            * res_multiplier
+            * dmg_taken_multiplier
+            * universal_dmg_reduction_multiplier
+            * weaken_multiplier
+        )
+
+    def multiplier(self, attacker_level: int, cache: Optional["EnemyMultiplierCache"] = None) -> float:
+        """
+        Returns the combined enemy-side multiplier, memoized in `cache`.
+
+        Args:
+            attacker_level: The attacker's character level.
+            cache: The cache to use. Defaults to the module-level default_enemy_cache.
+
+        Returns:
+            The same value as calculate_multiplier(attacker_level).
+        """
+        if cache is None:
+            cache = default_enemy_cache
+        return cache.get(self, attacker_level)
+
+
+class EnemyMultiplierCache(CountingLRUCache[float]):
+    """
+    Bounded LRU cache of EnemyProfile multipliers keyed by (profile, attacker_level).
+
+    Keeps hit, miss and eviction counters. Safe to share between threads.
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        super().__init__(maxsize, "enemy_cache")
+
+    def get(self, profile: EnemyProfile, attacker_level: int) -> float:
+        return self.get_or_compute(
+            (profile, attacker_level), lambda: profile.calculate_multiplier(attacker_level)
+        )
+
+
+default_enemy_cache = EnemyMultiplierCache()
+
+
+def calculate_outgoing_damage_vs_profile(
+    skill_multiplier: float,
+    scaling_attribute_value: float,
+    extra_multiplier: float,
+    extra_dmg: float,
+    elemental_dmg_bonus_percent: float,
+    all_type_dmg_bonus_percent: float,
+    dot_dmg_bonus_percent: float,
+    other_dmg_bonus_percent: float,
+    attacker_level: int,
+    enemy: EnemyProfile,
+    cache: Optional[EnemyMultiplierCache] = None,
+) -> float:
+    """
+    Calculates outgoing damage against an EnemyProfile, reusing its cached multiplier.
+
+    Equivalent to calculate_outgoing_damage with the profile's fields, to within
+    floating-point rounding (the enemy-side stages are multiplied together first).
+
+    Args:
+        skill_multiplier: The skill's damage multiplier (e.g., 0.6 for 60%).
+        scaling_attribute_value: The value of the character's scaling attribute (ATK, HP, or DEF).
+        extra_multiplier: An additional damage multiplier (e.g., 0.2 for 20%).
+        extra_dmg: A flat amount of extra damage.
+        elemental_dmg_bonus_percent: Elemental damage bonus percentage.
+        all_type_dmg_bonus_percent: All type damage bonus percentage.
+        dot_dmg_bonus_percent: Damage over time (DoT) bonus percentage.
+        other_dmg_bonus_percent: Other miscellaneous damage bonus percentage.
+        attacker_level: The attacker's character level.
+        enemy: The enemy profile (stages 3 to 8).
+        cache: The cache to use. Defaults to default_enemy_cache.
+
+    Returns:
+        The final calculated outgoing damage.
+    """
+    # 1. Base_DMG
+    base_dmg = (skill_multiplier + extra_multiplier) * scaling_attribute_value + extra_dmg
+
+    # 2. DMG_Percent_Multiplier
+    dmg_percent_multiplier = (
+        1
+        + elemental_dmg_bonus_percent
+        + all_type_dmg_bonus_percent
+        + dot_dmg_bonus_percent
+        + other_dmg_bonus_percent
+    )
+
+    return base_dmg * dmg_percent_multiplier * enemy.multiplier(attacker_level, cache)
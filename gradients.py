@@ -0,0 +1,230 @@
+from typing import Dict, Mapping, Sequence, Tuple, Union
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+from batch_calculator import (
+    DAMAGE_PARAMETER_NAMES,
+    RaggedSources,
+    _as_float_array,
+    calculate_outgoing_damage_batch,
+)
+
+
+def _ragged_other_factor_products(sources: RaggedSources) -> np.ndarray:
+    # For every source value, the product of (1 - s) over the *other* sources of its row,
+    # computed without dividing by a factor that may be exactly zero.
+    offsets = np.asarray(sources.offsets, dtype=np.int64)
+    factors = 1 - np.asarray(sources.values, dtype=np.float64)
+    counts = np.diff(offsets)
+    row_of_value = np.repeat(np.arange(len(counts)), counts)
+    is_zero = factors == 0
+    zero_counts = np.bincount(row_of_value, weights=is_zero, minlength=len(counts)).astype(np.int64)
+    non_zero_products = np.ones(len(counts), dtype=np.float64)
+    non_empty = counts > 0
+    if non_empty.any():
+        non_zero_products[non_empty] = np.multiply.reduceat(
+            np.where(is_zero, 1.0, factors), offsets[:-1][non_empty]
+        )
+    row_zeros = zero_counts[row_of_value]
+    row_products = non_zero_products[row_of_value]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        others = np.where(
+            row_zeros == 0,
+            row_products / np.where(is_zero, 1.0, factors),
+            np.where((row_zeros == 1) & is_zero, row_products, 0.0),
+        )
+    return others
+
+
+def calculate_outgoing_damage_gradients(
+    skill_multiplier: ArrayLike,
+    scaling_attribute_value: ArrayLike,
+    extra_multiplier: ArrayLike,
+    extra_dmg: ArrayLike,
+    elemental_dmg_bonus_percent: ArrayLike,
+    all_type_dmg_bonus_percent: ArrayLike,
+    dot_dmg_bonus_percent: ArrayLike,
+    other_dmg_bonus_percent: ArrayLike,
+    attacker_level: ArrayLike,
+    enemy_base_def: ArrayLike,
+    enemy_def_percent_buffs_debuffs: ArrayLike,
+    def_reduction_percent: ArrayLike,
+    def_ignore_percent: ArrayLike,
+    enemy_current_res_percent: ArrayLike,
+    res_pen_percent: ArrayLike,
+    elemental_dmg_taken_bonus_percent: ArrayLike,
+    all_type_dmg_taken_bonus_percent: ArrayLike,
+    universal_dmg_reduction_sources: Union[Sequence[ArrayLike], RaggedSources],
+    weaken_percent: ArrayLike,
+) -> Tuple[np.ndarray, Dict[str, object]]:
+    """
+    Computes outgoing damage and its exact partial derivatives w.r.t. every input.
+
+    Arguments are the same as calculate_outgoing_damage_batch and the damage is
+    bit-identical to it. The clamps are respected: when Enemy_Final_DEF is
+    clamped at 0 the DEF inputs have zero derivative, and when
+    Enemy_Current_RES - RES_PEN lies outside (-1.0, 0.9) the RES inputs have zero
+    derivative. At the exact clamp boundary the clamped (zero) side is used.
+
+    Args:
+        See calculate_outgoing_damage_batch.
+
+    Returns:
+        A (damage, gradients) tuple. gradients maps every parameter name to an array
+        of dDamage/dParameter with the damage's shape. For universal_dmg_reduction_sources
+        the entry is a list with one array per source, or, for RaggedSources, one
+        float64 array aligned with sources.values.
+    """
+    breakdown = calculate_outgoing_damage_batch(
+        skill_multiplier,
+        scaling_attribute_value,
+        extra_multiplier,
+        extra_dmg,
+        elemental_dmg_bonus_percent,
+        all_type_dmg_bonus_percent,
+        dot_dmg_bonus_percent,
+        other_dmg_bonus_percent,
+        attacker_level,
+        enemy_base_def,
+        enemy_def_percent_buffs_debuffs,
+        def_reduction_percent,
+        def_ignore_percent,
+        enemy_current_res_percent,
+        res_pen_percent,
+        elemental_dmg_taken_bonus_percent,
+        all_type_dmg_taken_bonus_percent,
+        universal_dmg_reduction_sources,
+        weaken_percent,
+        explain=True,
+    )
+    shape = breakdown.shape
+    damage = breakdown["outgoing_dmg"]
+    base_dmg = breakdown["base_dmg"]
+    dmg_percent_multiplier = breakdown["dmg_percent_multiplier"]
+    enemy_final_def = breakdown["enemy_final_def"]
+    def_multiplier = breakdown["def_multiplier"]
+    res_multiplier = breakdown["res_multiplier"]
+    dmg_taken_multiplier = breakdown["dmg_taken_multiplier"]
+    universal_dmg_reduction_multiplier = breakdown["universal_dmg_reduction_multiplier"]
+    weaken_multiplier = breakdown["weaken_multiplier"]
+
+    def broadcast(value: ArrayLike) -> np.ndarray:
+        return np.broadcast_to(_as_float_array(value), shape)
+
+    # Products of every factor but one; no division, so zero factors are handled exactly.
+    attacker_side = base_dmg * dmg_percent_multiplier
+    enemy_factors = {
+        "def": def_multiplier,
+        "res": res_multiplier,
+        "dmg_taken": dmg_taken_multiplier,
+        "universal": universal_dmg_reduction_multiplier,
+        "weaken": weaken_multiplier,
+    }
+
+    def without(excluded: str) -> np.ndarray:
+        product = attacker_side
+        for name, factor in enemy_factors.items():
+            if name != excluded:
+                product = product * factor
+        return product
+
+    enemy_side = def_multiplier * res_multiplier * dmg_taken_multiplier
+    enemy_side = enemy_side * universal_dmg_reduction_multiplier * weaken_multiplier
+    without_base = dmg_percent_multiplier * enemy_side
+    without_dmg_percent = base_dmg * enemy_side
+    without_def = without("def")
+    without_res = without("res")
+    without_dmg_taken = without("dmg_taken")
+    without_universal = without("universal")
+    without_weaken = without("weaken")
+
+    gradients: Dict[str, object] = {}
+
+    # 1. Base_DMG = (skill + extra) * attribute + extra_dmg
+    attribute = broadcast(scaling_attribute_value)
+    gradients["skill_multiplier"] = attribute * without_base
+    gradients["extra_multiplier"] = attribute * without_base
+    gradients["scaling_attribute_value"] = (broadcast(skill_multiplier) + broadcast(extra_multiplier)) * without_base
+    gradients["extra_dmg"] = np.array(without_base)
+
+    # 2. DMG_Percent_Multiplier is 1 + the sum of the bonuses
+    for name in (
+        "elemental_dmg_bonus_percent",
+        "all_type_dmg_bonus_percent",
+        "dot_dmg_bonus_percent",
+        "other_dmg_bonus_percent",
+    ):
+        gradients[name] = np.array(without_dmg_percent)
+
+    # 3./4. DEF_Multiplier = c / (E + c) with c = 200 + 10 * level, so
+    # dDEF/dE = -c / (E + c)^2 and dDEF/dlevel = 10 * E / (E + c)^2.
+    level_term = 200 + (10 * broadcast(attacker_level))
+    denominator = enemy_final_def + level_term
+    def_percent_factor = (
+        1
+        + broadcast(enemy_def_percent_buffs_debuffs)
+        - (broadcast(def_reduction_percent) + broadcast(def_ignore_percent))
+    )
+    raw_enemy_def = broadcast(enemy_base_def) * def_percent_factor
+    def_active = (raw_enemy_def > 0) & (denominator != 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        d_def_d_enemy_def = np.where(def_active, -level_term / (denominator * denominator), 0.0)
+        d_def_d_level = np.where(denominator != 0, 10 * enemy_final_def / (denominator * denominator), 0.0)
+    d_damage_d_enemy_def = without_def * d_def_d_enemy_def
+    gradients["attacker_level"] = without_def * d_def_d_level
+    gradients["enemy_base_def"] = d_damage_d_enemy_def * def_percent_factor
+    gradients["enemy_def_percent_buffs_debuffs"] = d_damage_d_enemy_def * broadcast(enemy_base_def)
+    gradients["def_reduction_percent"] = -d_damage_d_enemy_def * broadcast(enemy_base_def)
+    gradients["def_ignore_percent"] = -d_damage_d_enemy_def * broadcast(enemy_base_def)
+
+    # 5. RES_Multiplier = 1 - clamp(res - pen, -1.0, 0.9)
+    effective_res = broadcast(enemy_current_res_percent) - broadcast(res_pen_percent)
+    res_active = (effective_res > -1.0) & (effective_res < 0.9)
+    gradients["enemy_current_res_percent"] = np.where(res_active, -without_res, 0.0)
+    gradients["res_pen_percent"] = np.where(res_active, without_res, 0.0)
+
+    # 6. DMG_Taken_Multiplier is 1 + the sum of the bonuses
+    gradients["elemental_dmg_taken_bonus_percent"] = np.array(without_dmg_taken)
+    gradients["all_type_dmg_taken_bonus_percent"] = np.array(without_dmg_taken)
+
+    # 7. Universal_DMG_Reduction_Multiplier = prod(1 - s)
+    if isinstance(universal_dmg_reduction_sources, RaggedSources):
+        counts = np.diff(np.asarray(universal_dmg_reduction_sources.offsets, dtype=np.int64))
+        row_of_value = np.repeat(np.arange(len(counts)), counts)
+        other_factors = _ragged_other_factor_products(universal_dmg_reduction_sources)
+        gradients["universal_dmg_reduction_sources"] = -(without_universal.reshape(-1)[row_of_value] * other_factors)
+    else:
+        factors = [1 - broadcast(source) for source in universal_dmg_reduction_sources]
+        source_gradients = []
+        for position in range(len(factors)):
+            others = np.ones(shape)
+            for other_position, factor in enumerate(factors):
+                if other_position != position:
+                    others = others * factor
+            source_gradients.append(-without_universal * others)
+        gradients["universal_dmg_reduction_sources"] = source_gradients
+
+    # 8. Weaken_Multiplier = 1 - weaken
+    gradients["weaken_percent"] = -without_weaken
+
+    return damage, gradients
+
+
+def calculate_stat_weights(
+    gradients: Mapping[str, object], increments: Mapping[str, float]
+) -> Dict[str, np.ndarray]:
+    """
+    Converts gradients into first-order damage gained per stat increment (e.g. one substat roll).
+
+    Args:
+        gradients: The gradients from calculate_outgoing_damage_gradients.
+        increments: The size of one increment per parameter, e.g. {"res_pen_percent": 0.1}.
+
+    Returns:
+        dDamage/dParameter * increment for every parameter in increments.
+    """
+    unknown = [name for name in increments if name not in DAMAGE_PARAMETER_NAMES]
+    if unknown:
+        raise ValueError(f"Unknown parameters: {', '.join(unknown)}")
+    return {name: np.asarray(gradients[name]) * increment for name, increment in increments.items()}
@@ -0,0 +1,144 @@
+from typing import Callable, Dict, List, Mapping, Tuple
+
+import numpy as np
+
+from batch_calculator import (
+    DAMAGE_ARGUMENT_NAMES,
+    DAMAGE_PRODUCT_FACTORS,
+    calculate_base_dmg_batch,
+    calculate_def_multiplier_batch,
+    calculate_dmg_percent_multiplier_batch,
+    calculate_dmg_taken_multiplier_batch,
+    calculate_enemy_final_def_batch,
+    calculate_res_multiplier_batch,
+    calculate_universal_dmg_reduction_multiplier_batch,
+    calculate_weaken_multiplier_batch,
+)
+
+# (stage, stage inputs, parameter inputs, function), in evaluation order. Each function
+# is called with the stage inputs followed by the parameter inputs, positionally; they
+# are the stages of calculate_outgoing_damage_batch, so results stay bit-identical to it.
+_STAGES: Tuple[Tuple[str, Tuple[str, ...], Tuple[str, ...], Callable[..., np.ndarray]], ...] = (
+    (
+        "base_dmg",
+        (),
+        ("skill_multiplier", "scaling_attribute_value", "extra_multiplier", "extra_dmg"),
+        calculate_base_dmg_batch,
+    ),
+    (
+        "dmg_percent_multiplier",
+        (),
+        ("elemental_dmg_bonus_percent", "all_type_dmg_bonus_percent", "dot_dmg_bonus_percent", "other_dmg_bonus_percent"),
+        calculate_dmg_percent_multiplier_batch,
+    ),
+    (
+        "enemy_final_def",
+        (),
+        ("enemy_base_def", "enemy_def_percent_buffs_debuffs", "def_reduction_percent", "def_ignore_percent"),
+        calculate_enemy_final_def_batch,
+    ),
+    ("def_multiplier", ("enemy_final_def",), ("attacker_level",), calculate_def_multiplier_batch),
+    ("res_multiplier", (), ("enemy_current_res_percent", "res_pen_percent"), calculate_res_multiplier_batch),
+    (
+        "dmg_taken_multiplier",
+        (),
+        ("elemental_dmg_taken_bonus_percent", "all_type_dmg_taken_bonus_percent"),
+        calculate_dmg_taken_multiplier_batch,
+    ),
+    (
+        "universal_dmg_reduction_multiplier",
+        (),
+        ("universal_dmg_reduction_sources",),
+        calculate_universal_dmg_reduction_multiplier_batch,
+    ),
+    ("weaken_multiplier", (), ("weaken_percent",), calculate_weaken_multiplier_batch),
+)
+
+
+class IncrementalDamageEvaluator:
+    """
+    Batch damage evaluator that keeps every stage's intermediate arrays.
+
+    After construction, update() changes some parameters and recomputes only the
+    stages that depend on them. The final product is kept as running prefix
+    products (base, base * dmg%, ...), so only the factors from the first changed
+    one onwards are multiplied again; e.g. a RES change recomputes Step 5 and the
+    last four multiplications. Results are bit-identical to
+    calculate_outgoing_damage_batch.
+    """
+
+    def __init__(self, params: Mapping[str, object]):
+        """
+        Args:
+            params: Every calculate_outgoing_damage_batch argument (scalars or arrays).
+        """
+        missing = [name for name in DAMAGE_ARGUMENT_NAMES if name not in params]
+        if missing:
+            raise ValueError(f"Missing parameters: {', '.join(missing)}")
+        self._check_names(params)
+        self._params: Dict[str, object] = dict(params)
+        self._stages: Dict[str, np.ndarray] = {}
+        self._prefix_products: List[np.ndarray] = []
+        self.last_recomputed: Tuple[str, ...] = ()
+        self._recompute({stage for stage, _, _, _ in _STAGES})
+
+    @staticmethod
+    def _check_names(params: Mapping[str, object]) -> None:
+        unknown = [name for name in params if name not in DAMAGE_ARGUMENT_NAMES]
+        if unknown:
+            raise ValueError(f"Unknown parameters: {', '.join(unknown)}")
+
+    @property
+    def damage(self) -> np.ndarray:
+        """The current final outgoing damage."""
+        return self._prefix_products[-1]
+
+    @property
+    def params(self) -> Dict[str, object]:
+        """A copy of the current parameters."""
+        return dict(self._params)
+
+    def stage(self, name: str) -> np.ndarray:
+        """
+        Returns the current value of an intermediate stage (e.g. "res_multiplier").
+        """
+        return self._stages[name]
+
+    def update(self, **changes: object) -> np.ndarray:
+        """
+        Changes parameters and recomputes only the dependent stages.
+
+        Args:
+            **changes: New values for any calculate_outgoing_damage_batch arguments.
+
+        Returns:
+            The new final outgoing damage.
+        """
+        self._check_names(changes)
+        self._params.update(changes)
+        dirty = set()
+        for stage, stage_inputs, inputs, _ in _STAGES:
+            if any(name in changes for name in inputs) or any(name in dirty for name in stage_inputs):
+                dirty.add(stage)
+        self._recompute(dirty)
+        return self.damage
+
+    def _recompute(self, dirty: set) -> None:
+        for stage, stage_inputs, inputs, function in _STAGES:
+            if stage in dirty:
+                self._stages[stage] = function(
+                    *(self._stages[name] for name in stage_inputs), *(self._params[name] for name in inputs)
+                )
+        self.last_recomputed = tuple(stage for stage, _, _, _ in _STAGES if stage in dirty)
+
+        dirty_factors = [position for position, factor in enumerate(DAMAGE_PRODUCT_FACTORS) if factor in dirty]
+        if not dirty_factors:
+            return
+        first = dirty_factors[0]
+        del self._prefix_products[first:]
+        for factor in DAMAGE_PRODUCT_FACTORS[first:]:
+            if self._prefix_products:
+                self._prefix_products.append(self._prefix_products[-1] * self._stages[factor])
+            else:
+                self._prefix_products.append(self._stages[factor])
+        self._prefix_products[-1] = np.asarray(self._prefix_products[-1], dtype=np.float64)
@@ -0,0 +1,171 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+# Stage names, in pipeline order, as recorded by the scalar and batch damage paths.
+DAMAGE_STAGE_NAMES = (
+    "base_dmg",
+    "dmg_percent_multiplier",
+    "enemy_final_def",
+    "def_multiplier",
+    "res_multiplier",
+    "dmg_taken_multiplier",
+    "universal_dmg_reduction_multiplier",
+    "weaken_multiplier",
+    "outgoing_dmg",
+)
+
+
+class StageTimer:
+    """
+    Records consecutive stage timings for one evaluation of a pipeline.
+
+    Each lap() charges the time since the previous lap (or since creation) to the
+    named stage, together with the number of rows and bytes the stage produced.
+    """
+
+    __slots__ = ("_stats", "_path", "_last")
+
+    def __init__(self, stats: "PipelineStats", path: str):
+        self._stats = stats
+        self._path = path
+        self._last = time.perf_counter()
+
+    def lap(self, stage: str, value: object = None) -> None:
+        now = time.perf_counter()
+        rows = getattr(value, "size", 1)
+        nbytes = getattr(value, "nbytes", 0)
+        self._stats.record_stage(self._path, stage, now - self._last, rows, nbytes)
+        self._last = time.perf_counter()
+
+
+class PipelineStats:
+    """
+    Opt-in collector for per-stage wall time, row counts, allocation sizes and counters.
+
+    Instrumented code checks `enabled` once per call and does nothing else when it is
+    False, so the collector costs close to nothing until it is switched on.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """
+        Clears every recorded stage and counter.
+        """
+        with self._lock:
+            self.stage_seconds: Dict[str, float] = {}
+            self.stage_calls: Dict[str, int] = {}
+            self.stage_rows: Dict[str, int] = {}
+            self.stage_bytes: Dict[str, int] = {}
+            self.counters: Dict[str, int] = {}
+
+    def stage_timer(self, path: str) -> StageTimer:
+        return StageTimer(self, path)
+
+    def record_stage(self, path: str, stage: str, seconds: float, rows: int = 1, nbytes: int = 0) -> None:
+        key = f"{path}.{stage}"
+        with self._lock:
+            self.stage_seconds[key] = self.stage_seconds.get(key, 0.0) + seconds
+            self.stage_calls[key] = self.stage_calls.get(key, 0) + 1
+            self.stage_rows[key] = self.stage_rows.get(key, 0) + int(rows)
+            self.stage_bytes[key] = self.stage_bytes.get(key, 0) + int(nbytes)
+
+    def increment(self, counter: str, amount: int = 1) -> None:
+        with self._lock:
+            self.counters[counter] = self.counters.get(counter, 0) + amount
+
+    def export(self) -> Dict[str, float]:
+        """
+        Returns every measurement as a flat {metric name: value} dict for dashboards.
+
+        Stage metrics are named "stage.<path>.<stage>.<seconds|calls|rows|bytes>" and
+        counters "counter.<name>".
+        """
+        with self._lock:
+            metrics: Dict[str, float] = {}
+            for key in self.stage_seconds:
+                metrics[f"stage.{key}.seconds"] = self.stage_seconds[key]
+                metrics[f"stage.{key}.calls"] = self.stage_calls[key]
+                metrics[f"stage.{key}.rows"] = self.stage_rows[key]
+                metrics[f"stage.{key}.bytes"] = self.stage_bytes[key]
+            for name, value in self.counters.items():
+                metrics[f"counter.{name}"] = value
+            return metrics
+
+    def to_prometheus(self, prefix: str = "star_calc") -> str:
+        """
+        Formats the measurements in the Prometheus text exposition format.
+        """
+        lines: List[str] = []
+        with self._lock:
+            for metric, values in (
+                ("stage_seconds_total", self.stage_seconds),
+                ("stage_calls_total", self.stage_calls),
+                ("stage_rows_total", self.stage_rows),
+                ("stage_bytes_total", self.stage_bytes),
+            ):
+                lines.append(f"# TYPE {prefix}_{metric} counter")
+                for key, value in values.items():
+                    path, stage = key.split(".", 1)
+                    lines.append(f'{prefix}_{metric}{{path="{path}",stage="{stage}"}} {value}')
+            lines.append(f"# TYPE {prefix}_events_total counter")
+            for name, value in self.counters.items():
+                lines.append(f'{prefix}_events_total{{counter="{name}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+    def summary(self) -> str:
+        """
+        Returns a human-readable table of time, calls, rows and bytes per stage.
+        """
+        with self._lock:
+            keys = sorted(
+                self.stage_seconds,
+                key=lambda key: (key.split(".", 1)[0], _stage_order(key.split(".", 1)[1])),
+            )
+            total_seconds = sum(self.stage_seconds.values()) or 1.0
+            lines = [f"{'stage':<45} {'time (ms)':>12} {'share':>7} {'calls':>10} {'rows':>14} {'bytes':>14}"]
+            for key in keys:
+                lines.append(
+                    f"{key:<45} {self.stage_seconds[key] * 1e3:>12.3f} "
+                    f"{self.stage_seconds[key] / total_seconds:>7.1%} {self.stage_calls[key]:>10} "
+                    f"{self.stage_rows[key]:>14} {self.stage_bytes[key]:>14}"
+                )
+            for name in sorted(self.counters):
+                lines.append(f"{name:<45} {self.counters[name]:>12}")
+            return "\n".join(lines)
+
+
+def _stage_order(stage: str) -> int:
+    return DAMAGE_STAGE_NAMES.index(stage) if stage in DAMAGE_STAGE_NAMES else len(DAMAGE_STAGE_NAMES)
+
+
+pipeline_stats = PipelineStats()
+
+
+@contextmanager
+def instrumented(stats: Optional[PipelineStats] = None, reset: bool = True) -> Iterator[PipelineStats]:
+    """
+    Enables instrumentation for the duration of a with-block.
+
+    Args:
+        stats: The collector to enable. Defaults to the module-level pipeline_stats,
+            which is the one the damage functions report to.
+        reset: Whether to clear previous measurements first.
+
+    Yields:
+        The enabled collector.
+    """
+    stats = stats or pipeline_stats
+    if reset:
+        stats.reset()
+    previous = stats.enabled
+    stats.enabled = True
+    try:
+        yield stats
+    finally:
+        stats.enabled = previous
@@ -0,0 +1,177 @@
+from typing import Dict, Mapping, Optional, Tuple
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+from batch_calculator import (
+    DAMAGE_ARGUMENT_NAMES,
+    DAMAGE_PARAMETER_NAMES,
+    DAMAGE_PRODUCT_FACTORS,
+    _as_float_array,
+    calculate_outgoing_damage_batch,
+)
+
+# Parameters that damage depends on affinely: (stage containing the parameter, parameter
+# multiplied into that stage or None for an additive term, sign).
+LINEAR_PARAMETER_STAGES: Dict[str, Tuple[str, Optional[Tuple[str, ...]], float]] = {
+    "skill_multiplier": ("base_dmg", ("scaling_attribute_value",), 1.0),
+    "extra_multiplier": ("base_dmg", ("scaling_attribute_value",), 1.0),
+    "scaling_attribute_value": ("base_dmg", ("skill_multiplier", "extra_multiplier"), 1.0),
+    "extra_dmg": ("base_dmg", None, 1.0),
+    "elemental_dmg_bonus_percent": ("dmg_percent_multiplier", None, 1.0),
+    "all_type_dmg_bonus_percent": ("dmg_percent_multiplier", None, 1.0),
+    "dot_dmg_bonus_percent": ("dmg_percent_multiplier", None, 1.0),
+    "other_dmg_bonus_percent": ("dmg_percent_multiplier", None, 1.0),
+    "elemental_dmg_taken_bonus_percent": ("dmg_taken_multiplier", None, 1.0),
+    "all_type_dmg_taken_bonus_percent": ("dmg_taken_multiplier", None, 1.0),
+    "weaken_percent": ("weaken_multiplier", None, -1.0),
+}
+
+LINEAR_PARAMETER_NAMES: Tuple[str, ...] = tuple(LINEAR_PARAMETER_STAGES)
+
+# Default search ranges for the parameters that go through a clamp (DEF >= 0, RES in
+# [-1.0, 0.9]) or a ratio, solved by batched bracketing.
+DEFAULT_SOLVER_BOUNDS: Dict[str, Tuple[float, float]] = {
+    "attacker_level": (1.0, 80.0),
+    "enemy_base_def": (0.0, 10000.0),
+    "enemy_def_percent_buffs_debuffs": (-1.0, 1.0),
+    "def_reduction_percent": (0.0, 1.0),
+    "def_ignore_percent": (0.0, 1.0),
+    "enemy_current_res_percent": (-1.0, 1.0),
+    "res_pen_percent": (0.0, 1.0),
+}
+
+
+def _evaluate(parameter: str, value: np.ndarray, params: Mapping[str, object], explain: bool = False) -> np.ndarray:
+    arguments = dict(params)
+    arguments[parameter] = value
+    return calculate_outgoing_damage_batch(**arguments, explain=explain)
+
+
+def _solve_linear(parameter: str, targets: np.ndarray, params: Mapping[str, object]) -> np.ndarray:
+    stage, slope_parameters, sign = LINEAR_PARAMETER_STAGES[parameter]
+    # The stage is affine in the parameter, so linearizing at 0 gives the exact solution.
+    current = np.zeros(targets.shape)
+    breakdown = _evaluate(parameter, current, params, explain=True)
+
+    other_factors = np.ones(targets.shape)
+    for factor in DAMAGE_PRODUCT_FACTORS:
+        if factor != stage:
+            other_factors = other_factors * breakdown[factor]
+    if slope_parameters is None:
+        slope = sign
+    else:
+        slope = sign * sum(_as_float_array(params[name]) for name in slope_parameters)
+
+    # Damage = other_factors * stage and the stage is affine in the parameter, so
+    # parameter = current + (target / other_factors - stage) / slope.
+    with np.errstate(divide="ignore", invalid="ignore"):
+        required_stage = targets / other_factors
+        solution = current + (required_stage - breakdown[stage]) / slope
+    reachable = np.isfinite(solution)
+    return np.where(reachable, solution, np.nan)
+
+
+def _solve_bracketed(
+    parameter: str,
+    targets: np.ndarray,
+    params: Mapping[str, object],
+    lower: ArrayLike,
+    upper: ArrayLike,
+    tolerance: float,
+    max_iterations: int,
+) -> np.ndarray:
+    low = np.broadcast_to(_as_float_array(lower), targets.shape).copy()
+    high = np.broadcast_to(_as_float_array(upper), targets.shape).copy()
+    if np.any(low > high):
+        raise ValueError("lower must not exceed upper.")
+    damage_low = _evaluate(parameter, low, params)
+    damage_high = _evaluate(parameter, high, params)
+    increasing = damage_high >= damage_low
+
+    # Damage is monotone in every bracketed parameter. `good` is the end of the bracket
+    # that reaches the target and `bad` the end that does not; bisection keeps that
+    # invariant and converges on the value where the target is first reached.
+    good = np.where(increasing, high, low)
+    bad = np.where(increasing, low, high)
+    damage_good = np.maximum(damage_low, damage_high)
+    damage_bad = np.minimum(damage_low, damage_high)
+    already_reached = damage_bad >= targets
+    reachable = damage_good >= targets
+
+    for _ in range(max_iterations):
+        if np.all(np.abs(good - bad) <= tolerance * (1 + np.abs(good))):
+            break
+        middle = 0.5 * (good + bad)
+        reaches = _evaluate(parameter, middle, params) >= targets
+        good = np.where(reaches, middle, good)
+        bad = np.where(reaches, bad, middle)
+
+    solution = np.where(already_reached, bad, good)
+    return np.where(reachable, solution, np.nan)
+
+
+def solve_required_value(
+    parameter: str,
+    targets: ArrayLike,
+    params: Mapping[str, object],
+    lower: Optional[ArrayLike] = None,
+    upper: Optional[ArrayLike] = None,
+    tolerance: float = 1e-12,
+    max_iterations: int = 200,
+) -> np.ndarray:
+    """
+    Finds the value of one parameter needed for the outgoing damage to reach each target.
+
+    Parameters that damage depends on affinely (skill and extra multipliers, the scaling
+    attribute, flat damage, the DMG% and DMG taken bonuses, weaken) are solved in
+    closed form and may return any real value, e.g. a negative bonus when the target
+    is below the current damage. The DEF, RES and level parameters go through a clamp
+    or a ratio and are solved by vectorized bisection within [lower, upper]; the
+    result is the value at which the target is first reached (the smallest value if
+    damage increases with the parameter, the largest if it decreases), or the bracket
+    end if it is reached everywhere in the bracket.
+
+    Args:
+        parameter: The free parameter, any calculate_outgoing_damage argument except
+            universal_dmg_reduction_sources.
+        targets: The damage to reach, a scalar or an array.
+        params: Every other calculate_outgoing_damage_batch argument (scalars or arrays
+            broadcast against targets). A value for `parameter` itself is ignored.
+        lower: Lower end of the search range for bracketed parameters. Defaults to
+            DEFAULT_SOLVER_BOUNDS.
+        upper: Upper end of the search range for bracketed parameters. Defaults to
+            DEFAULT_SOLVER_BOUNDS.
+        tolerance: Relative width of the final bracket.
+        max_iterations: Maximum number of bisection steps.
+
+    Returns:
+        A float64 array of required values with the broadcast shape of targets and
+        params. NaN where the target cannot be reached.
+    """
+    if parameter not in DAMAGE_PARAMETER_NAMES:
+        raise ValueError(f"Cannot solve for '{parameter}'.")
+    missing = [name for name in DAMAGE_ARGUMENT_NAMES if name != parameter and name not in params]
+    if missing:
+        raise ValueError(f"Missing parameters: {', '.join(missing)}")
+
+    other_params = {name: value for name, value in params.items() if name != parameter}
+    shape = np.broadcast_shapes(
+        np.shape(targets),
+        *(np.shape(value) for name, value in other_params.items() if name != "universal_dmg_reduction_sources"),
+    )
+    targets = np.broadcast_to(_as_float_array(targets), shape)
+
+    if parameter in LINEAR_PARAMETER_STAGES:
+        return _solve_linear(parameter, targets, other_params)
+
+    default_lower, default_upper = DEFAULT_SOLVER_BOUNDS[parameter]
+    return _solve_bracketed(
+        parameter,
+        targets,
+        other_params,
+        default_lower if lower is None else lower,
+        default_upper if upper is None else upper,
+        tolerance,
+        max_iterations,
+    )
@@ -0,0 +1,215 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist
+from typing import Mapping, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from damage_calculator import calculate_outgoing_damage
+
+DEFAULT_MONTE_CARLO_BATCH_SIZE = 1 << 16
+
+# Set in each worker process by _init_monte_carlo_worker so tasks only carry batch indices.
+_worker_table: Optional[np.ndarray] = None
+_worker_seed = 0
+_worker_batch_size = 0
+
+
+class RotationHit(NamedTuple):
+    """
+    One hit of a rotation, with its random outcomes.
+
+    The rotation has a single debuff: once any hit applies it, every later hit uses
+    debuffed_params instead of params.
+    """
+
+    params: Mapping[str, object]
+    crit_rate: float = 0.0
+    crit_dmg: float = 0.0
+    proc_chance: float = 1.0
+    debuff_chance: float = 0.0
+    debuffed_params: Optional[Mapping[str, object]] = None
+
+
+class MonteCarloResult(NamedTuple):
+    """
+    Estimated total rotation damage and how it was obtained.
+    """
+
+    mean: float
+    std: float
+    ci_half_width: float
+    samples: int
+    batches: int
+    converged: bool
+    elapsed: float
+    samples_per_second: float
+
+
+# Columns of the per-hit table the samplers read.
+_TABLE_DTYPE = np.dtype(
+    [
+        ("damage", np.float64),
+        ("debuffed_damage", np.float64),
+        ("crit_rate", np.float64),
+        ("crit_dmg", np.float64),
+        ("proc_chance", np.float64),
+        ("debuff_chance", np.float64),
+    ]
+)
+
+
+def build_rotation_table(hits: Sequence[RotationHit]) -> np.ndarray:
+    """
+    Evaluates every hit's non-crit damage once, with and without the debuff.
+
+    Returns:
+        A structured array with one row per hit.
+    """
+    if not hits:
+        raise ValueError("A rotation needs at least one hit.")
+    table = np.empty(len(hits), dtype=_TABLE_DTYPE)
+    for position, hit in enumerate(hits):
+        for name in ("crit_rate", "proc_chance", "debuff_chance"):
+            if not 0 <= getattr(hit, name) <= 1:
+                raise ValueError(f"Hit {position}: {name} must be between 0 and 1.")
+        damage = calculate_outgoing_damage(**hit.params)
+        debuffed_damage = damage if hit.debuffed_params is None else calculate_outgoing_damage(**hit.debuffed_params)
+        table[position] = (damage, debuffed_damage, hit.crit_rate, hit.crit_dmg, hit.proc_chance, hit.debuff_chance)
+    return table
+
+
+def simulate_rotation_batch(table: np.ndarray, seed: int, batch_index: int, batch_size: int) -> np.ndarray:
+    """
+    Draws batch_size total rotation damage samples.
+
+    Every batch has its own random stream derived from (seed, batch_index), so a batch
+    gives the same samples whichever worker process draws it.
+
+    Args:
+        table: The table from build_rotation_table.
+        seed: The run's seed.
+        batch_index: The batch number.
+        batch_size: The number of samples.
+
+    Returns:
+        A float64 array of batch_size totals.
+    """
+    generator = np.random.Generator(np.random.PCG64(np.random.SeedSequence(seed, spawn_key=(batch_index,))))
+    totals = np.zeros(batch_size, dtype=np.float64)
+    debuffed = np.zeros(batch_size, dtype=bool)
+    for hit in table:
+        # One draw per outcome: whether the hit happens, whether it crits, whether it debuffs.
+        draws = generator.random((3, batch_size))
+        happens = draws[0] < hit["proc_chance"]
+        crits = draws[1] < hit["crit_rate"]
+        damage = np.where(debuffed, hit["debuffed_damage"], hit["damage"])
+        totals += np.where(happens, damage * np.where(crits, 1 + hit["crit_dmg"], 1.0), 0.0)
+        debuffed |= happens & (draws[2] < hit["debuff_chance"])
+    return totals
+
+
+def _batch_moments(table: np.ndarray, seed: int, batch_index: int, batch_size: int) -> Tuple[int, float, float]:
+    samples = simulate_rotation_batch(table, seed, batch_index, batch_size)
+    mean = float(samples.mean())
+    return batch_size, mean, float(np.sum((samples - mean) ** 2))
+
+
+def _init_monte_carlo_worker(table: np.ndarray, seed: int, batch_size: int) -> None:
+    global _worker_table, _worker_seed, _worker_batch_size
+    _worker_table = table
+    _worker_seed = seed
+    _worker_batch_size = batch_size
+
+
+def _monte_carlo_worker(batch_index: int) -> Tuple[int, float, float]:
+    return _batch_moments(_worker_table, _worker_seed, batch_index, _worker_batch_size)
+
+
+def run_monte_carlo(
+    hits: Sequence[RotationHit],
+    seed: int = 0,
+    relative_tolerance: float = 0.001,
+    confidence: float = 0.95,
+    max_samples: int = 1 << 24,
+    batch_size: int = DEFAULT_MONTE_CARLO_BATCH_SIZE,
+    workers: Optional[int] = None,
+) -> MonteCarloResult:
+    """
+    Estimates the mean total damage of a rotation whose crits, procs and debuff
+    applications are random.
+
+    Batches of samples are drawn in a process pool, one round of `workers` batches at
+    a time. Batch moments are merged in batch order and the confidence interval is
+    checked after every batch, so the run stops at the same batch, with the same
+    result, whatever the number of workers.
+
+    Args:
+        hits: The rotation's hits, in order.
+        seed: Seed of the run; each batch derives its own stream from it.
+        relative_tolerance: Stop once the confidence interval's half-width is at most
+            this fraction of the mean.
+        confidence: Confidence level of the interval (e.g. 0.95).
+        max_samples: Stop after this many samples even if the interval is wider.
+        batch_size: Samples per batch.
+        workers: Number of worker processes. Defaults to os.cpu_count(); 1 runs in-process.
+
+    Returns:
+        A MonteCarloResult.
+    """
+    if batch_size <= 0 or max_samples <= 0:
+        raise ValueError("batch_size and max_samples must be positive.")
+    if not 0 < confidence < 1:
+        raise ValueError("confidence must be between 0 and 1.")
+    table = build_rotation_table(hits)
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+    max_batches = max(1, -(-max_samples // batch_size))
+    workers = min(workers or os.cpu_count() or 1, max_batches)
+
+    started = time.perf_counter()
+    count, mean, squared_deviations = 0, 0.0, 0.0
+    half_width = float("inf")
+    converged = False
+    executor = None
+    if workers > 1:
+        executor = ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_monte_carlo_worker, initargs=(table, seed, batch_size)
+        )
+    try:
+        next_batch = 0
+        while next_batch < max_batches and not converged:
+            batch_indices = range(next_batch, min(next_batch + workers, max_batches))
+            if executor is None:
+                moments = [_batch_moments(table, seed, index, batch_size) for index in batch_indices]
+            else:
+                moments = list(executor.map(_monte_carlo_worker, batch_indices))
+            for batch_count, batch_mean, batch_squared_deviations in moments:
+                # Merge the batch into the running moments (Chan et al.).
+                total = count + batch_count
+                delta = batch_mean - mean
+                mean += delta * batch_count / total
+                squared_deviations += batch_squared_deviations + delta * delta * count * batch_count / total
+                count = total
+                next_batch += 1
+                std = (squared_deviations / (count - 1)) ** 0.5 if count > 1 else 0.0
+                half_width = z * std / count ** 0.5
+                if half_width <= relative_tolerance * abs(mean):
+                    converged = True
+                    break
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+    elapsed = time.perf_counter() - started
+    std = (squared_deviations / (count - 1)) ** 0.5 if count > 1 else 0.0
+    return MonteCarloResult(
+        mean=mean,
+        std=std,
+        ci_half_width=half_width,
+        samples=count,
+        batches=next_batch,
+        converged=converged,
+        elapsed=elapsed,
+        samples_per_second=count / elapsed if elapsed > 0 else float("inf"),
+    )
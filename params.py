@@ -0,0 +1,108 @@
+from typing import Dict, NamedTuple, Sequence, Tuple
+
+from damage_calculator import (
+    calculate_outgoing_damage,
+    calculate_total_atk,
+    calculate_total_def,
+    calculate_total_hp,
+)
+from enemy_profile import EnemyProfile
+
+# StatParams.stat -> the function computing that stat.
+STAT_FUNCTIONS = {
+    "atk": calculate_total_atk,
+    "hp": calculate_total_hp,
+    "def": calculate_total_def,
+}
+
+# The StatParams fields passed to the stat function, in argument order.
+STAT_INPUT_NAMES: Tuple[str, ...] = ("char_base", "lc_base", "percent_bonus", "flat_bonus")
+
+
+class _DamageParamsFields(NamedTuple):
+    skill_multiplier: float
+    scaling_attribute_value: float
+    extra_multiplier: float
+    extra_dmg: float
+    elemental_dmg_bonus_percent: float
+    all_type_dmg_bonus_percent: float
+    dot_dmg_bonus_percent: float
+    other_dmg_bonus_percent: float
+    attacker_level: int
+    enemy_base_def: float
+    enemy_def_percent_buffs_debuffs: float
+    def_reduction_percent: float
+    def_ignore_percent: float
+    enemy_current_res_percent: float
+    res_pen_percent: float
+    elemental_dmg_taken_bonus_percent: float
+    all_type_dmg_taken_bonus_percent: float
+    universal_dmg_reduction_sources: Tuple[float, ...]
+    weaken_percent: float
+
+
+class DamageParams(_DamageParamsFields):
+    """
+    Immutable, hashable bundle of calculate_outgoing_damage arguments.
+
+    Fields are in calculate_outgoing_damage's argument order, so evaluate() can
+    pass them positionally. universal_dmg_reduction_sources is converted to a
+    tuple on construction so the whole object can be used as a dict or cache key;
+    _replace(...) makes a modified copy.
+    """
+
+    __slots__ = ()
+
+    def __new__(cls, *args: object, **kwargs: object) -> "DamageParams":
+        params = super().__new__(cls, *args, **kwargs)
+        if not isinstance(params.universal_dmg_reduction_sources, tuple):
+            params = params._replace(universal_dmg_reduction_sources=tuple(params.universal_dmg_reduction_sources))
+        return params
+
+    @classmethod
+    def create(cls, universal_dmg_reduction_sources: Sequence[float] = (), **kwargs: float) -> "DamageParams":
+        """
+        Builds params from keyword arguments.
+        """
+        return cls(universal_dmg_reduction_sources=universal_dmg_reduction_sources, **kwargs)
+
+    def evaluate(self) -> float:
+        """
+        Calculates the outgoing damage for these parameters (positional fast path).
+        """
+        return calculate_outgoing_damage(*self)
+
+    def as_kwargs(self) -> Dict[str, object]:
+        """
+        Returns the parameters as calculate_outgoing_damage keyword arguments.
+        """
+        kwargs = self._asdict()
+        kwargs["universal_dmg_reduction_sources"] = list(self.universal_dmg_reduction_sources)
+        return kwargs
+
+    def enemy_profile(self) -> EnemyProfile:
+        """
+        Returns the enemy-side parameters as an EnemyProfile.
+        """
+        return EnemyProfile(*self[9:])
+
+
+class StatParams(NamedTuple):
+    """
+    Immutable, hashable bundle of calculate_total_atk/hp/def arguments.
+
+    `stat` selects the function ("atk", "hp" or "def"); the other fields are passed
+    to it positionally by evaluate().
+    """
+
+    char_base: float
+    lc_base: float
+    percent_bonus: float
+    flat_bonus: float
+    stat: str = "atk"
+
+    def evaluate(self) -> float:
+        """
+        Calculates the total ATK, HP or DEF for these parameters.
+        """
+        return STAT_FUNCTIONS[self.stat](self.char_base, self.lc_base, self.percent_bonus, self.flat_bonus)
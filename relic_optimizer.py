@@ -0,0 +1,223 @@
+import heapq
+from typing import Dict, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+from bound_damage import bind_outgoing_damage
+from damage_calculator import calculate_total_atk
+
+# Relic stats understood by the optimizer. ATK stats feed calculate_total_atk; the rest are
+# calculate_outgoing_damage parameters that relic stats add to. Damage is non-decreasing in
+# every one of them, which is what makes the branch-and-bound upper bound valid.
+ATK_STAT_NAMES: Tuple[str, ...] = ("atk_percent_bonus", "flat_atk_bonus")
+DAMAGE_STAT_NAMES: Tuple[str, ...] = (
+    "elemental_dmg_bonus_percent",
+    "all_type_dmg_bonus_percent",
+    "dot_dmg_bonus_percent",
+    "other_dmg_bonus_percent",
+    "def_reduction_percent",
+    "def_ignore_percent",
+    "res_pen_percent",
+)
+OPTIMIZER_STAT_NAMES: Tuple[str, ...] = ATK_STAT_NAMES + DAMAGE_STAT_NAMES
+# Only used when a minimum SPD is given (e.g. from SpeedBreakpointIndex.required_speed).
+SPEED_STAT_NAMES: Tuple[str, ...] = ("spd_percent_bonus", "flat_spd_bonus")
+
+
+class Relic(NamedTuple):
+    """
+    A relic (or planar ornament) piece.
+
+    Stats use the optimizer's stat names (e.g. {"atk_percent_bonus": 0.432}); stats the
+    damage formula does not use, such as crit, may be present and are ignored; SPD
+    (SPEED_STAT_NAMES) only counts towards a min_speed constraint.
+    """
+
+    slot: str
+    main_stat: Tuple[str, float]
+    sub_stats: Tuple[Tuple[str, float], ...] = ()
+    name: str = ""
+
+    def stat_totals(self) -> Dict[str, float]:
+        totals: Dict[str, float] = {}
+        for stat_name, value in (self.main_stat,) + tuple(self.sub_stats):
+            totals[stat_name] = totals.get(stat_name, 0.0) + value
+        return totals
+
+
+class OptimizedBuild(NamedTuple):
+    damage: float
+    total_atk: float
+    relics: Tuple[Relic, ...]
+
+
+class OptimizerStats(NamedTuple):
+    nodes_visited: int
+    nodes_pruned: int
+    builds_evaluated: int
+    exhaustive_builds: int
+
+
+def optimize_relics(
+    inventory: Mapping[str, Sequence[Relic]],
+    char_base_atk: float,
+    lc_base_atk: float,
+    damage_params: Mapping[str, object],
+    base_stats: Optional[Mapping[str, float]] = None,
+    top_k: int = 1,
+    base_speed: float = 0.0,
+    min_speed: Optional[float] = None,
+) -> Tuple[List[OptimizedBuild], OptimizerStats]:
+    """
+    Finds the relic combinations that maximize outgoing damage using branch and bound.
+
+    One relic is chosen per slot. Slots are explored depth first; for each partial
+    build an upper bound is computed by giving every remaining slot the per-stat
+    maximum over its candidates, and branches whose bound cannot beat the current
+    k-th best build are pruned. The result is the same as evaluating every
+    combination, as long as all relic stat values are non-negative and the fixed
+    damage parameters keep every multiplier non-negative. With min_speed, builds below
+    it are skipped and branches that cannot reach it even with the fastest remaining
+    relics are pruned.
+
+    Args:
+        inventory: Candidate relics per slot (e.g. {"head": [...], "hands": [...], ...}).
+        char_base_atk: The character's base ATK.
+        lc_base_atk: The base ATK from the equipped Light Cone.
+        damage_params: Every calculate_outgoing_damage argument except scaling_attribute_value.
+            Relic stats are added on top of the values given for DAMAGE_STAT_NAMES.
+        base_stats: Non-relic ATK and SPD bonuses (atk_percent_bonus, flat_atk_bonus,
+            spd_percent_bonus, flat_spd_bonus) from traces, buffs, etc.
+        top_k: Number of builds to return.
+        base_speed: The character's base SPD, used with min_speed.
+        min_speed: Optional minimum total SPD, e.g. SpeedBreakpointIndex.required_speed(actions, cycles).
+
+    Returns:
+        The best builds, highest damage first (relics in inventory slot order), and search statistics.
+    """
+    if top_k <= 0:
+        raise ValueError("top_k must be positive.")
+    slots = list(inventory)
+    if not slots or any(not inventory[slot] for slot in slots):
+        raise ValueError("Every slot in the inventory needs at least one relic.")
+
+    base_stats = dict(base_stats or {})
+    stat_names = OPTIMIZER_STAT_NAMES if min_speed is None else OPTIMIZER_STAT_NAMES + SPEED_STAT_NAMES
+    start_vector = tuple(
+        float(base_stats.get(name, 0.0)) if name not in DAMAGE_STAT_NAMES else float(damage_params.get(name, 0.0))
+        for name in stat_names
+    )
+
+    # Each relic as a stat vector over stat_names.
+    candidates: List[List[Tuple[Tuple[float, ...], Relic]]] = []
+    for slot in slots:
+        slot_candidates = []
+        for relic in inventory[slot]:
+            totals = relic.stat_totals()
+            vector = tuple(float(totals.get(name, 0.0)) for name in stat_names)
+            if any(value < 0 for value in vector):
+                raise ValueError(f"Relic {relic.name or relic} has a negative stat; bounds would be invalid.")
+            slot_candidates.append((vector, relic))
+        candidates.append(slot_candidates)
+
+    # A relic that is matched or beaten in every stat by top_k other relics of its slot can be
+    # swapped for each of them without losing damage, so it can never be needed in the top_k.
+    for slot_index, slot_candidates in enumerate(candidates):
+        candidates[slot_index] = [
+            (vector, relic)
+            for position, (vector, relic) in enumerate(slot_candidates)
+            if sum(
+                1
+                for other_position, (other, _) in enumerate(slot_candidates)
+                if other_position != position
+                and all(o >= v for o, v in zip(other, vector))
+                and (other != vector or other_position < position)
+            )
+            < top_k
+        ]
+
+    fixed = {
+        name: value
+        for name, value in damage_params.items()
+        if name not in DAMAGE_STAT_NAMES and name != "scaling_attribute_value"
+    }
+    damage_kernel = bind_outgoing_damage(fixed)
+    free_damage_stats = [name for name in damage_kernel.free_parameters if name != "scaling_attribute_value"]
+    unexpected = [name for name in free_damage_stats if name not in DAMAGE_STAT_NAMES]
+    if unexpected:
+        raise ValueError(f"Missing damage parameters: {', '.join(unexpected)}")
+    damage_stat_positions = [OPTIMIZER_STAT_NAMES.index(name) for name in free_damage_stats]
+
+    def evaluate(vector: Tuple[float, ...]) -> Tuple[float, float]:
+        total_atk = calculate_total_atk(char_base_atk, lc_base_atk, vector[0], vector[1])
+        return damage_kernel(total_atk, *(vector[position] for position in damage_stat_positions)), total_atk
+
+    def add(left: Tuple[float, ...], right: Tuple[float, ...]) -> Tuple[float, ...]:
+        return tuple(a + b for a, b in zip(left, right))
+
+    def fast_enough(vector: Tuple[float, ...]) -> bool:
+        return base_speed * (1 + vector[-2]) + vector[-1] >= min_speed
+
+    # Try strong relics first so good incumbents are found early, and branch first on the
+    # slots whose choice matters most so the bounds tighten as early as possible.
+    spreads = []
+    for slot_candidates in candidates:
+        slot_candidates.sort(key=lambda candidate: evaluate(add(start_vector, candidate[0]))[0], reverse=True)
+        spreads.append(
+            evaluate(add(start_vector, slot_candidates[0][0]))[0]
+            - evaluate(add(start_vector, slot_candidates[-1][0]))[0]
+        )
+    slot_order = sorted(range(len(slots)), key=lambda slot_index: spreads[slot_index], reverse=True)
+    candidates = [candidates[slot_index] for slot_index in slot_order]
+
+    # optimistic_rest[i]: per-stat maximum over slots i.. summed, the best any completion can add.
+    optimistic_rest = [tuple(0.0 for _ in stat_names)]
+    for slot_candidates in reversed(candidates):
+        slot_max = tuple(max(values) for values in zip(*(vector for vector, _ in slot_candidates)))
+        optimistic_rest.append(add(optimistic_rest[-1], slot_max))
+    optimistic_rest.reverse()
+
+    best: List[Tuple[float, int, float, Tuple[Relic, ...]]] = []  # min-heap of the top_k builds
+    counters = {"visited": 0, "pruned": 0, "evaluated": 0}
+    chosen: List[Relic] = []
+
+    def search(slot_index: int, vector: Tuple[float, ...]) -> None:
+        counters["visited"] += 1
+        if min_speed is not None and not fast_enough(add(vector, optimistic_rest[slot_index])):
+            counters["pruned"] += 1
+            return
+        if slot_index == len(candidates):
+            damage, total_atk = evaluate(vector)
+            counters["evaluated"] += 1
+            entry = (damage, -counters["evaluated"], total_atk, tuple(chosen))
+            if len(best) < top_k:
+                heapq.heappush(best, entry)
+            elif damage > best[0][0]:
+                heapq.heapreplace(best, entry)
+            return
+        if len(best) == top_k:
+            upper_bound, _ = evaluate(add(vector, optimistic_rest[slot_index]))
+            if upper_bound <= best[0][0]:
+                counters["pruned"] += 1
+                return
+        for relic_vector, relic in candidates[slot_index]:
+            chosen.append(relic)
+            search(slot_index + 1, add(vector, relic_vector))
+            chosen.pop()
+
+    search(0, start_vector)
+
+    exhaustive_builds = 1
+    for slot in slots:
+        exhaustive_builds *= len(inventory[slot])
+    builds = []
+    for damage, _, total_atk, relics_in_search_order in sorted(best, reverse=True):
+        relics: List[Relic] = [None] * len(slots)
+        for slot_index, relic in zip(slot_order, relics_in_search_order):
+            relics[slot_index] = relic
+        builds.append(OptimizedBuild(damage=damage, total_atk=total_atk, relics=tuple(relics)))
+    stats = OptimizerStats(
+        nodes_visited=counters["visited"],
+        nodes_pruned=counters["pruned"],
+        builds_evaluated=counters["evaluated"],
+        exhaustive_builds=exhaustive_builds,
+    )
+    return builds, stats
@@ -0,0 +1,139 @@
+from collections import Counter
+from typing import Dict, Hashable, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+from batch_calculator import calculate_outgoing_damage_batch
+from bounded_cache import CountingLRUCache
+from timeline import (
+    TimelineEvent,
+    TimelineSimulator,
+    TimelineUnit,
+    apply_damage_bonuses,
+    cycle_action_value,
+)
+
+
+class RotationSchedule(NamedTuple):
+    """
+    The turn order of a simulation with the buffs active on each turn, without damage.
+
+    Everything in it depends only on speeds, actions and buffs, so it can be replayed
+    for any number of builds that share them.
+    """
+
+    events: Tuple[TimelineEvent, ...]
+
+
+class ReplayResult(NamedTuple):
+    total_damage: np.ndarray
+    damage_by_unit: Dict[str, np.ndarray]
+
+
+def schedule_key(units: Sequence[TimelineUnit], cycles: int) -> Hashable:
+    """
+    Returns a hashable key of everything that affects the schedule. Damage parameters
+    are left out; only whether an action deals damage matters.
+    """
+    unit_keys = []
+    for unit in units:
+        actions = tuple(
+            (action.damage_params is not None, action.advances, action.buffs) for action in unit.actions
+        )
+        unit_keys.append((unit.name, unit.base_speed, unit.speed_percent, unit.flat_speed, actions))
+    return tuple(unit_keys), cycles
+
+
+def build_rotation_schedule(units: Sequence[TimelineUnit], cycles: int) -> RotationSchedule:
+    """
+    Runs the timeline once without evaluating damage and keeps the resulting schedule.
+    """
+    result = TimelineSimulator(units).run(cycle_action_value(cycles), evaluate_damage=False)
+    return RotationSchedule(result.events)
+
+
+class ScheduleCache(CountingLRUCache[RotationSchedule]):
+    """
+    Bounded LRU cache of RotationSchedules keyed by schedule_key(units, cycles).
+
+    Keeps hit, miss and eviction counters. Safe to share between threads.
+    """
+
+    def __init__(self, maxsize: int = 256):
+        super().__init__(maxsize, "schedule_cache")
+
+    def get(self, units: Sequence[TimelineUnit], cycles: int) -> RotationSchedule:
+        return self.get_or_compute(schedule_key(units, cycles), lambda: build_rotation_schedule(units, cycles))
+
+
+default_schedule_cache = ScheduleCache()
+
+
+def replay_schedule(
+    schedule: RotationSchedule,
+    units: Sequence[TimelineUnit],
+    build_params: Mapping[str, Mapping[str, ArrayLike]],
+) -> ReplayResult:
+    """
+    Sums a schedule's damage for many builds at once.
+
+    Turns with the same unit, action and active buffs deal the same damage, so each
+    distinct combination is evaluated once with the batch kernel and multiplied by how
+    often it occurs.
+
+    Args:
+        schedule: The schedule from build_rotation_schedule or a ScheduleCache.
+        units: The units the schedule was built from; their actions' damage_params are
+            the defaults for every build.
+        build_params: Per unit name, calculate_outgoing_damage arguments that differ
+            between builds (e.g. {"dps": {"scaling_attribute_value": atk_values}}),
+            as arrays broadcast against each other.
+
+    Returns:
+        A ReplayResult with the total damage and the damage per unit, one value per build.
+    """
+    units_by_name = {unit.name: unit for unit in units}
+    unknown = [name for name in build_params if name not in units_by_name]
+    if unknown:
+        raise ValueError(f"Unknown units: {', '.join(unknown)}")
+
+    occurrences = Counter(
+        (event.unit, event.action_index, event.active_buffs)
+        for event in schedule.events
+        if units_by_name[event.unit].actions[event.action_index].damage_params is not None
+    )
+    damage_by_unit: Dict[str, np.ndarray] = {name: np.zeros(()) for name in units_by_name}
+    for (name, action_index, active_buffs), count in occurrences.items():
+        params = dict(units_by_name[name].actions[action_index].damage_params)
+        params.update(build_params.get(name, {}))
+        damage = calculate_outgoing_damage_batch(**apply_damage_bonuses(params, active_buffs))
+        damage_by_unit[name] = damage_by_unit[name] + count * damage
+
+    total_damage = np.zeros(())
+    for damage in damage_by_unit.values():
+        total_damage = total_damage + damage
+    return ReplayResult(total_damage, damage_by_unit)
+
+
+def evaluate_rotation_builds(
+    units: Sequence[TimelineUnit],
+    cycles: int,
+    build_params: Mapping[str, Mapping[str, ArrayLike]],
+    cache: Optional[ScheduleCache] = None,
+) -> ReplayResult:
+    """
+    Evaluates a rotation for many builds, running the scheduler only on a cache miss.
+
+    Args:
+        units: The characters and enemies, in tie-break order.
+        cycles: The number of cycles to simulate.
+        build_params: See replay_schedule.
+        cache: The cache to use. Defaults to default_schedule_cache.
+
+    Returns:
+        A ReplayResult.
+    """
+    if cache is None:
+        cache = default_schedule_cache
+    return replay_schedule(cache.get(units, cycles), units, build_params)
@@ -0,0 +1,242 @@
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Union
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+from batch_calculator import DAMAGE_PARAMETER_NAMES, RaggedSources, calculate_outgoing_damage_batch
+
+INTEGER_PARAMETER_NAMES = ("attacker_level",)
+
+
+def _column_dtype(name: str) -> type:
+    return np.int64 if name in INTEGER_PARAMETER_NAMES else np.float64
+
+
+def _read_only(array: np.ndarray) -> np.ndarray:
+    # A view, so the caller's own array (which ascontiguousarray may return as is) stays writable.
+    view = array.view()
+    view.flags.writeable = False
+    return view
+
+
+class ScenarioTable:
+    """
+    Columnar (struct-of-arrays) container for calculate_outgoing_damage inputs.
+
+    Each parameter is stored as one contiguous typed array of length n. The
+    per-scenario universal_dmg_reduction_sources lists are stored as a ragged
+    offsets+values pair: the sources of row i are
+    reduction_values[reduction_offsets[i]:reduction_offsets[i + 1]].
+
+    Tables are immutable: every stored array is a read-only view. Slicing and
+    filtering return new tables (contiguous slices share memory with the original).
+    """
+
+    def __init__(
+        self,
+        columns: Mapping[str, ArrayLike],
+        reduction_offsets: ArrayLike,
+        reduction_values: ArrayLike,
+    ):
+        """
+        Args:
+            columns: One array per name in DAMAGE_PARAMETER_NAMES, all of the same length.
+            reduction_offsets: int array of length n + 1, starting at 0 and non-decreasing.
+            reduction_values: float array holding every row's reduction sources back to back.
+        """
+        missing = [name for name in DAMAGE_PARAMETER_NAMES if name not in columns]
+        if missing:
+            raise ValueError(f"Missing columns: {', '.join(missing)}")
+        unknown = [name for name in columns if name not in DAMAGE_PARAMETER_NAMES]
+        if unknown:
+            raise ValueError(f"Unknown columns: {', '.join(unknown)}")
+
+        self._columns: Dict[str, np.ndarray] = {}
+        length = None
+        for name in DAMAGE_PARAMETER_NAMES:
+            if name in INTEGER_PARAMETER_NAMES:
+                raw = np.asarray(columns[name])
+                # Casting would silently truncate e.g. a level of 50.5 to 50.
+                if raw.dtype.kind not in "iub" and np.any(raw != np.trunc(raw)):
+                    raise ValueError(f"Column '{name}' must hold integers.")
+            column = np.ascontiguousarray(columns[name], dtype=_column_dtype(name))
+            if column.ndim != 1:
+                raise ValueError(f"Column '{name}' must be one-dimensional.")
+            if length is None:
+                length = len(column)
+            elif len(column) != length:
+                raise ValueError(f"Column '{name}' has length {len(column)}, expected {length}.")
+            self._columns[name] = _read_only(column)
+
+        offsets = np.ascontiguousarray(reduction_offsets, dtype=np.int64)
+        values = np.ascontiguousarray(reduction_values, dtype=np.float64)
+        if offsets.ndim != 1 or len(offsets) != length + 1:
+            raise ValueError(f"reduction_offsets must have length {length + 1}.")
+        if offsets[0] != 0 or offsets[-1] != len(values) or np.any(np.diff(offsets) < 0):
+            raise ValueError("reduction_offsets must start at 0, be non-decreasing and end at len(reduction_values).")
+        self.reduction_offsets = _read_only(offsets)
+        self.reduction_values = _read_only(values)
+
+    @classmethod
+    def from_columns(
+        cls,
+        universal_dmg_reduction_sources: Optional[Sequence[Sequence[float]]] = None,
+        **columns: ArrayLike,
+    ) -> "ScenarioTable":
+        """
+        Builds a table from keyword columns, broadcasting scalars against arrays.
+
+        Args:
+            universal_dmg_reduction_sources: One list of reduction sources per row. A single
+                list shared by every row may be given as [[0.1]]. Defaults to no sources.
+            **columns: One scalar or array per name in DAMAGE_PARAMETER_NAMES.
+
+        Returns:
+            A new ScenarioTable.
+        """
+        names = list(columns)
+        broadcast = np.broadcast_arrays(*(np.asarray(columns[name]) for name in names))
+        length = broadcast[0].size if broadcast else 0
+        flat = {name: column.reshape(-1) for name, column in zip(names, broadcast)}
+
+        if universal_dmg_reduction_sources is None:
+            universal_dmg_reduction_sources = [[]]
+        if len(universal_dmg_reduction_sources) == 1 and length != 1:
+            shared = np.asarray(universal_dmg_reduction_sources[0], dtype=np.float64)
+            offsets = np.arange(length + 1, dtype=np.int64) * len(shared)
+            values = np.tile(shared, length)
+        else:
+            if len(universal_dmg_reduction_sources) != length:
+                raise ValueError(
+                    f"Expected {length} reduction source lists, got {len(universal_dmg_reduction_sources)}."
+                )
+            offsets, values = RaggedSources.from_lists(universal_dmg_reduction_sources)
+        return cls(flat, offsets, values)
+
+    @classmethod
+    def from_records(cls, records: Iterable[Mapping[str, object]]) -> "ScenarioTable":
+        """
+        Builds a table from an iterable of calculate_outgoing_damage keyword dicts.
+
+        Args:
+            records: Mappings holding every calculate_outgoing_damage argument.
+
+        Returns:
+            A new ScenarioTable.
+        """
+        lists: Dict[str, List[object]] = {name: [] for name in DAMAGE_PARAMETER_NAMES}
+        sources: List[Sequence[float]] = []
+        for record in records:
+            for name in DAMAGE_PARAMETER_NAMES:
+                lists[name].append(record[name])
+            sources.append(record.get("universal_dmg_reduction_sources", ()))
+        offsets, values = RaggedSources.from_lists(sources)
+        return cls(lists, offsets, values)
+
+    @classmethod
+    def concatenate(cls, tables: Sequence["ScenarioTable"]) -> "ScenarioTable":
+        """
+        Stacks several tables row-wise into a new table.
+        """
+        if not tables:
+            return cls.from_records([])
+        columns = {
+            name: np.concatenate([table._columns[name] for table in tables])
+            for name in DAMAGE_PARAMETER_NAMES
+        }
+        counts = np.concatenate([table.reduction_counts for table in tables])
+        offsets = np.concatenate(([0], np.cumsum(counts)))
+        values = np.concatenate([table.reduction_values for table in tables])
+        return cls(columns, offsets, values)
+
+    def __len__(self) -> int:
+        return len(self.reduction_offsets) - 1
+
+    def __repr__(self) -> str:
+        return f"ScenarioTable(rows={len(self)}, reduction_values={len(self.reduction_values)})"
+
+    @property
+    def columns(self) -> Dict[str, np.ndarray]:
+        """The parameter columns as read-only arrays, keyed by parameter name."""
+        return dict(self._columns)
+
+    @property
+    def reduction_counts(self) -> np.ndarray:
+        """Number of universal damage reduction sources on each row."""
+        return np.diff(self.reduction_offsets)
+
+    @property
+    def reduction_sources(self) -> RaggedSources:
+        """The universal damage reduction sources as a RaggedSources pair."""
+        return RaggedSources(self.reduction_offsets, self.reduction_values)
+
+    def column(self, name: str) -> np.ndarray:
+        return self._columns[name]
+
+    def row(self, index: int) -> Dict[str, object]:
+        """
+        Returns row `index` as keyword arguments for calculate_outgoing_damage.
+        """
+        index = range(len(self))[index]
+        record: Dict[str, object] = {name: column[index].item() for name, column in self._columns.items()}
+        start, stop = self.reduction_offsets[index], self.reduction_offsets[index + 1]
+        record["universal_dmg_reduction_sources"] = self.reduction_values[start:stop].tolist()
+        return record
+
+    def __getitem__(self, key: Union[int, slice, ArrayLike]) -> Union[Dict[str, object], "ScenarioTable"]:
+        """
+        An int returns a row dict; a slice, boolean mask or index array returns a new table.
+        """
+        if isinstance(key, (int, np.integer)):
+            return self.row(int(key))
+        if isinstance(key, slice):
+            start, stop, step = key.indices(len(self))
+            if step == 1:
+                stop = max(start, stop)
+                offsets = self.reduction_offsets[start:stop + 1]
+                values = self.reduction_values[offsets[0]:offsets[-1]]
+                columns = {name: column[start:stop] for name, column in self._columns.items()}
+                return ScenarioTable(columns, offsets - offsets[0], values)
+            return self.take(np.arange(start, stop, step))
+        key = np.asarray(key)
+        if key.dtype == np.bool_:
+            return self.filter(key)
+        return self.take(key)
+
+    def filter(self, mask: ArrayLike) -> "ScenarioTable":
+        """
+        Returns the rows where `mask` is True.
+        """
+        mask = np.asarray(mask, dtype=np.bool_)
+        if mask.shape != (len(self),):
+            raise ValueError(f"Mask must have shape ({len(self)},), got {mask.shape}.")
+        return self.take(np.flatnonzero(mask))
+
+    def take(self, indices: ArrayLike) -> "ScenarioTable":
+        """
+        Returns the rows at `indices` (in that order, repeats allowed).
+        """
+        indices = np.asarray(indices, dtype=np.int64)
+        columns = {name: column[indices] for name, column in self._columns.items()}
+        starts = self.reduction_offsets[:-1][indices]
+        counts = self.reduction_counts[indices]
+        offsets = np.concatenate(([0], np.cumsum(counts)))
+        # Position of every gathered value in the source values array.
+        gather = np.repeat(starts - offsets[:-1], counts) + np.arange(offsets[-1])
+        return ScenarioTable(columns, offsets, self.reduction_values[gather])
+
+
+def calculate_outgoing_damage_table(table: ScenarioTable, explain: bool = False) -> np.ndarray:
+    """
+    Evaluates calculate_outgoing_damage for every row of a ScenarioTable.
+
+    Args:
+        table: The scenarios to evaluate.
+        explain: If True, return the per-stage breakdown (see calculate_outgoing_damage_batch).
+
+    Returns:
+        A float64 array with one damage value per row, or a structured breakdown array.
+    """
+    return calculate_outgoing_damage_batch(
+        **table.columns, universal_dmg_reduction_sources=table.reduction_sources, explain=explain
+    )
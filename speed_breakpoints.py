@@ -0,0 +1,91 @@
+import math
+from bisect import bisect_right
+from typing import Dict, List
+
+from timeline import ACTION_GAUGE, cycle_action_value
+
+
+def count_actions(speed: float, max_action_value: float) -> int:
+    """
+    Counts the turns a unit with constant SPD takes up to and including max_action_value.
+
+    Turn times are accumulated the way TimelineSimulator does (each turn 10000 / SPD
+    after the previous one), so the count matches a simulation exactly.
+    """
+    if speed <= 0:
+        return 0
+    turn_length = ACTION_GAUGE / speed
+    action_value = turn_length
+    actions = 0
+    while action_value <= max_action_value:
+        actions += 1
+        action_value += turn_length
+    return actions
+
+
+def _minimum_speed(actions: int, max_action_value: float) -> float:
+    # Start from the closed form and step one float at a time to absorb rounding.
+    speed = actions * ACTION_GAUGE / max_action_value
+    while count_actions(speed, max_action_value) < actions:
+        speed = math.nextafter(speed, math.inf)
+    while count_actions(math.nextafter(speed, 0.0), max_action_value) >= actions:
+        speed = math.nextafter(speed, 0.0)
+    return speed
+
+
+class SpeedBreakpointIndex:
+    """
+    Precomputed SPD breakpoints: for every cycle count, the minimum SPD for each number
+    of turns a unit takes within that many cycles (150 AV for the first cycle, 100 AV
+    for each later one), assuming no action advance, delay or SPD buffs.
+
+    Lookups are a bisection over one sorted row, O(log max_actions).
+    """
+
+    def __init__(self, max_cycles: int = 10, max_actions: int = 20):
+        if max_cycles < 1 or max_actions < 1:
+            raise ValueError("max_cycles and max_actions must be at least 1.")
+        self.max_cycles = max_cycles
+        self.max_actions = max_actions
+        # _thresholds[cycles - 1][actions - 1]: the minimum SPD for `actions` turns.
+        self._thresholds: List[List[float]] = [
+            [_minimum_speed(actions, cycle_action_value(cycles)) for actions in range(1, max_actions + 1)]
+            for cycles in range(1, max_cycles + 1)
+        ]
+
+    def _row(self, cycles: int) -> List[float]:
+        if not 1 <= cycles <= self.max_cycles:
+            raise ValueError(f"cycles must be between 1 and {self.max_cycles}.")
+        return self._thresholds[cycles - 1]
+
+    def required_speed(self, actions: int, cycles: int) -> float:
+        """
+        Returns the minimum SPD for at least `actions` turns within `cycles` cycles.
+        """
+        if not 1 <= actions <= self.max_actions:
+            raise ValueError(f"actions must be between 1 and {self.max_actions}.")
+        return self._row(cycles)[actions - 1]
+
+    def actions_at(self, speed: float, cycles: int) -> int:
+        """
+        Returns the number of turns a unit with this SPD takes within `cycles` cycles,
+        capped at max_actions.
+        """
+        return bisect_right(self._row(cycles), speed)
+
+    def next_breakpoint(self, speed: float, cycles: int) -> float:
+        """
+        Returns the minimum SPD for one more turn than `speed` gets, or inf past max_actions.
+        """
+        row = self._row(cycles)
+        position = bisect_right(row, speed)
+        return row[position] if position < len(row) else math.inf
+
+    def table(self) -> Dict[int, Dict[int, float]]:
+        """
+        Returns every breakpoint as {cycles: {actions: minimum SPD}}.
+        """
+        return {
+            cycles: dict(enumerate(row, start=1))
+            for cycles, row in enumerate(self._thresholds, start=1)
+        }
@@ -0,0 +1,176 @@
+from collections import defaultdict
+from typing import Callable, Dict, List, Mapping, Optional, Sequence, Set
+
+from batch_calculator import DAMAGE_ARGUMENT_NAMES
+from damage_calculator import calculate_outgoing_damage
+from params import STAT_FUNCTIONS
+
+
+class StatGraph:
+    """
+    Lazily evaluated dependency graph of stat and damage values.
+
+    Input nodes hold values; computed nodes call a function with their
+    dependencies' values (positionally, in order). Changing an input marks every
+    downstream node dirty, and reading a node recomputes only the dirty nodes it
+    depends on. A dirty node's dependents are always dirty too, so propagation
+    stops at the first node that is already dirty.
+    """
+
+    def __init__(self):
+        self._values: Dict[str, object] = {}
+        self._functions: Dict[str, Callable[..., object]] = {}
+        self._dependencies: Dict[str, List[str]] = {}
+        self._dependents: Dict[str, List[str]] = defaultdict(list)
+        self._dirty: Set[str] = set()
+        self.recompute_count = 0
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._values or name in self._functions
+
+    def add_input(self, name: str, value: object) -> None:
+        if name in self:
+            raise ValueError(f"Node '{name}' already exists.")
+        self._values[name] = value
+
+    def add_node(self, name: str, function: Callable[..., object], dependencies: Sequence[str]) -> None:
+        """
+        Adds a computed node. Dependencies must already exist, so the graph stays acyclic.
+        """
+        if name in self:
+            raise ValueError(f"Node '{name}' already exists.")
+        missing = [dependency for dependency in dependencies if dependency not in self]
+        if missing:
+            raise ValueError(f"Unknown dependencies for '{name}': {', '.join(missing)}")
+        self._functions[name] = function
+        self._dependencies[name] = list(dependencies)
+        for dependency in dependencies:
+            self._dependents[dependency].append(name)
+        self._dirty.add(name)
+
+    def set(self, name: str, value: object) -> None:
+        """
+        Changes an input node and marks everything downstream of it dirty.
+        """
+        if name in self._functions:
+            raise ValueError(f"'{name}' is a computed node.")
+        if name not in self._values:
+            raise KeyError(name)
+        if self._values[name] == value:
+            return
+        self._values[name] = value
+        stack = list(self._dependents.get(name, ()))
+        while stack:
+            node = stack.pop()
+            if node in self._dirty:
+                continue
+            self._dirty.add(node)
+            stack.extend(self._dependents.get(node, ()))
+
+    def get(self, name: str) -> object:
+        """
+        Returns a node's value, recomputing it and its dirty ancestors if needed.
+        """
+        if name not in self._dirty:
+            if name not in self._values:
+                raise KeyError(name)
+            return self._values[name]
+        # Iterative post-order walk over the dirty part of the ancestry.
+        stack = [(name, False)]
+        while stack:
+            node, dependencies_ready = stack.pop()
+            if node not in self._dirty:
+                continue
+            if dependencies_ready:
+                arguments = [self._values[dependency] for dependency in self._dependencies[node]]
+                self._values[node] = self._functions[node](*arguments)
+                self._dirty.discard(node)
+                self.recompute_count += 1
+                continue
+            stack.append((node, True))
+            for dependency in self._dependencies[node]:
+                if dependency in self._dirty:
+                    stack.append((dependency, False))
+        return self._values[name]
+
+    def is_dirty(self, name: str) -> bool:
+        return name in self._dirty
+
+
+def _sum(*values: float) -> float:
+    return sum(values)
+
+
+def add_character(
+    graph: StatGraph,
+    name: str,
+    scaling_stat: str,
+    char_base: float,
+    lc_base: float,
+    percent_bonus: float,
+    flat_bonus: float,
+    damage_params: Mapping[str, object],
+    shared_percent_bonuses: Sequence[str] = (),
+    shared_damage_bonuses: Optional[Mapping[str, Sequence[str]]] = None,
+) -> str:
+    """
+    Adds a character's stat and damage nodes to a graph.
+
+    Creates input nodes "<name>.char_base", "<name>.lc_base", "<name>.percent_bonus",
+    "<name>.flat_bonus" and "<name>.<param>" for every damage parameter, a
+    "<name>.total_<stat>" node computed with calculate_total_atk/hp/def, and a
+    "<name>.damage" node computed with calculate_outgoing_damage using that total
+    as scaling_attribute_value. Shared buff nodes (e.g. a team-wide ATK% buff)
+    are added on top of the character's own values, so changing one buff only
+    recomputes the characters linked to it.
+
+    Args:
+        graph: The graph to extend.
+        name: Prefix for the character's nodes.
+        scaling_stat: "atk", "hp" or "def".
+        char_base: The character's base value of the scaling stat.
+        lc_base: The Light Cone's base value of the scaling stat.
+        percent_bonus: The character's own percentage bonus to the scaling stat.
+        flat_bonus: The character's own flat bonus to the scaling stat.
+        damage_params: Every calculate_outgoing_damage argument except scaling_attribute_value.
+        shared_percent_bonuses: Existing nodes added to percent_bonus.
+        shared_damage_bonuses: Existing nodes added to individual damage parameters,
+            e.g. {"def_reduction_percent": ["team.pela_ult"]}.
+
+    Returns:
+        The name of the character's damage node.
+    """
+    if scaling_stat not in STAT_FUNCTIONS:
+        raise ValueError("scaling_stat must be 'atk', 'hp' or 'def'.")
+    shared_damage_bonuses = shared_damage_bonuses or {}
+
+    graph.add_input(f"{name}.char_base", char_base)
+    graph.add_input(f"{name}.lc_base", lc_base)
+    graph.add_input(f"{name}.percent_bonus", percent_bonus)
+    graph.add_input(f"{name}.flat_bonus", flat_bonus)
+    percent_node = f"{name}.percent_bonus"
+    if shared_percent_bonuses:
+        percent_node = f"{name}.total_percent_bonus"
+        graph.add_node(percent_node, _sum, [f"{name}.percent_bonus", *shared_percent_bonuses])
+    total_node = f"{name}.total_{scaling_stat}"
+    graph.add_node(
+        total_node,
+        STAT_FUNCTIONS[scaling_stat],
+        [f"{name}.char_base", f"{name}.lc_base", percent_node, f"{name}.flat_bonus"],
+    )
+
+    damage_dependencies = []
+    for parameter in DAMAGE_ARGUMENT_NAMES:
+        if parameter == "scaling_attribute_value":
+            damage_dependencies.append(total_node)
+            continue
+        graph.add_input(f"{name}.{parameter}", damage_params[parameter])
+        node = f"{name}.{parameter}"
+        if shared_damage_bonuses.get(parameter):
+            node = f"{name}.total_{parameter}"
+            graph.add_node(node, _sum, [f"{name}.{parameter}", *shared_damage_bonuses[parameter]])
+        damage_dependencies.append(node)
+
+    damage_node = f"{name}.damage"
+    graph.add_node(damage_node, calculate_outgoing_damage, damage_dependencies)
+    return damage_node
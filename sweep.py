@@ -0,0 +1,182 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+from batch_calculator import DAMAGE_ARGUMENT_NAMES, calculate_outgoing_damage_batch
+
+DEFAULT_SWEEP_CHUNK_SIZE = 1 << 18
+
+# Set in each worker process by _init_sweep_worker so tasks only carry chunk bounds. The
+# arrays are views of shared memory blocks owned by the parent process.
+_worker_blocks: List[SharedMemory] = []
+_worker_axes: Dict[str, np.ndarray] = {}
+_worker_fixed: Dict[str, object] = {}
+_worker_output: Optional[np.ndarray] = None
+
+
+def _validate_sweep(axes: Mapping[str, ArrayLike], fixed: Mapping[str, object]) -> None:
+    if "universal_dmg_reduction_sources" in axes:
+        raise ValueError("universal_dmg_reduction_sources cannot be swept; pass it in fixed.")
+    overlap = [name for name in axes if name in fixed]
+    if overlap:
+        raise ValueError(f"Parameters given both as axes and fixed: {', '.join(overlap)}")
+    unknown = [name for name in list(axes) + list(fixed) if name not in DAMAGE_ARGUMENT_NAMES]
+    if unknown:
+        raise ValueError(f"Unknown parameters: {', '.join(unknown)}")
+    missing = [name for name in DAMAGE_ARGUMENT_NAMES if name not in axes and name not in fixed]
+    if missing:
+        raise ValueError(f"Missing parameters: {', '.join(missing)}")
+
+
+def sweep_chunks(total: int, chunk_size: int) -> List[Tuple[int, int]]:
+    """
+    Splits the flat index range [0, total) into consecutive (start, stop) chunks.
+    """
+    return [(start, min(start + chunk_size, total)) for start in range(0, total, chunk_size)]
+
+
+def evaluate_sweep_chunk(
+    axes: Mapping[str, np.ndarray],
+    fixed: Mapping[str, object],
+    start: int,
+    stop: int,
+) -> np.ndarray:
+    """
+    Evaluates grid points start..stop-1 of a sweep (C order over the axes).
+
+    Args:
+        axes: One 1-D array of values per swept parameter.
+        fixed: Values for every other calculate_outgoing_damage parameter.
+        start: First flat grid index.
+        stop: One past the last flat grid index.
+
+    Returns:
+        A float64 array of length stop - start.
+    """
+    shape = tuple(len(values) for values in axes.values())
+    if not shape:
+        # With no axes the grid is the single point described by fixed.
+        return np.broadcast_to(calculate_outgoing_damage_batch(**fixed), (stop - start,))
+    coordinates = np.unravel_index(np.arange(start, stop), shape)
+    columns = {name: values[index] for (name, values), index in zip(axes.items(), coordinates)}
+    return calculate_outgoing_damage_batch(**fixed, **columns)
+
+
+def _init_sweep_worker(
+    input_name: str,
+    axis_layout: Tuple[Tuple[str, int, int], ...],
+    output_name: str,
+    total: int,
+    fixed: Dict[str, object],
+) -> None:
+    global _worker_blocks, _worker_axes, _worker_fixed, _worker_output
+    # Pool workers share the parent's resource tracker, so attaching here does not hand
+    # ownership to the worker; the parent unlinks both blocks when the sweep is done.
+    input_block = SharedMemory(name=input_name)
+    output_block = SharedMemory(name=output_name)
+    _worker_blocks = [input_block, output_block]
+    inputs = np.ndarray((sum(length for _, _, length in axis_layout),), dtype=np.float64, buffer=input_block.buf)
+    _worker_axes = {name: inputs[offset:offset + length] for name, offset, length in axis_layout}
+    _worker_output = np.ndarray((total,), dtype=np.float64, buffer=output_block.buf)
+    _worker_fixed = fixed
+
+
+def _sweep_worker(bounds: Tuple[int, int]) -> int:
+    start, stop = bounds
+    _worker_output[start:stop] = evaluate_sweep_chunk(_worker_axes, _worker_fixed, start, stop)
+    return stop - start
+
+
+def _run_sweep_shared(
+    axes: Dict[str, np.ndarray],
+    fixed: Dict[str, object],
+    chunks: List[Tuple[int, int]],
+    total: int,
+    workers: int,
+    result: np.ndarray,
+) -> None:
+    # Axis values go into one shared input block and results into one shared output block;
+    # tasks and replies carry only chunk bounds and row counts.
+    axis_layout = []
+    offset = 0
+    for name, values in axes.items():
+        axis_layout.append((name, offset, len(values)))
+        offset += len(values)
+    input_block = SharedMemory(create=True, size=max(offset, 1) * 8)
+    output_block = SharedMemory(create=True, size=max(total, 1) * 8)
+    try:
+        inputs = np.ndarray((offset,), dtype=np.float64, buffer=input_block.buf)
+        for (name, start, length), values in zip(axis_layout, axes.values()):
+            inputs[start:start + length] = values
+        del inputs  # Release the view so the block can be closed.
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_sweep_worker,
+            initargs=(input_block.name, tuple(axis_layout), output_block.name, total, fixed),
+        ) as executor:
+            evaluated = sum(executor.map(_sweep_worker, chunks))
+        if evaluated != total:
+            raise RuntimeError(f"Sweep evaluated {evaluated} of {total} grid points.")
+        result[:] = np.ndarray((total,), dtype=np.float64, buffer=output_block.buf)
+    finally:
+        input_block.close()
+        input_block.unlink()
+        output_block.close()
+        output_block.unlink()
+
+
+def run_sweep(
+    axes: Mapping[str, ArrayLike],
+    fixed: Mapping[str, object],
+    workers: Optional[int] = None,
+    chunk_size: int = DEFAULT_SWEEP_CHUNK_SIZE,
+) -> np.ndarray:
+    """
+    Evaluates calculate_outgoing_damage over the Cartesian product of parameter axes.
+
+    The flattened grid is split into chunks that are evaluated with the batch
+    kernel in a process pool. Axis values are placed in shared memory and every
+    worker writes its chunk straight into a shared output buffer, so only chunk
+    bounds cross process boundaries. Each grid point is computed independently,
+    so the result is identical (bit for bit) whatever the number of workers.
+
+    Args:
+        axes: Swept parameters, each mapped to a 1-D sequence of values
+            (e.g. {"scaling_attribute_value": atk_values, "res_pen_percent": pens}).
+        fixed: Values for every other calculate_outgoing_damage parameter.
+        workers: Number of worker processes. Defaults to os.cpu_count(); 1 runs in-process.
+        chunk_size: Grid points per task.
+
+    Returns:
+        A float64 array of shape (len(axis) for axis in axes); 0-d when axes is empty.
+    """
+    _validate_sweep(axes, fixed)
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be positive.")
+    axes = {name: np.asarray(values, dtype=np.float64).reshape(-1) for name, values in axes.items()}
+    fixed = dict(fixed)
+    shape = tuple(len(values) for values in axes.values())
+    total = int(np.prod(shape, dtype=np.int64))
+    chunks = sweep_chunks(total, chunk_size)
+    workers = min(workers or os.cpu_count() or 1, max(len(chunks), 1))
+
+    result = np.empty(total, dtype=np.float64)
+    if workers == 1:
+        for start, stop in chunks:
+            result[start:stop] = evaluate_sweep_chunk(axes, fixed, start, stop)
+    else:
+        _run_sweep_shared(axes, fixed, chunks, total, workers, result)
+    return result.reshape(shape)
+
+
+def sweep_axis_values(axes: Mapping[str, Sequence[float]], flat_index: int) -> Dict[str, float]:
+    """
+    Returns the parameter values of one grid point of a sweep, given its flat index.
+    """
+    shape = tuple(len(values) for values in axes.values())
+    coordinates = np.unravel_index(flat_index, shape)
+    return {name: values[int(index)] for (name, values), index in zip(axes.items(), coordinates)}
@@ -0,0 +1,248 @@
+import heapq
+from typing import Dict, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+from damage_calculator import calculate_outgoing_damage
+
+# Every unit covers this distance between two turns, so one turn takes 10000 / SPD action value.
+ACTION_GAUGE = 10000.0
+FIRST_CYCLE_AV = 150.0
+CYCLE_AV = 100.0
+
+
+class Buff(NamedTuple):
+    """
+    A buff applied to one or more units for a number of the holder's turns.
+
+    The duration counts down at the end of each of the holder's turns; applying a buff
+    with the same name again refreshes it instead of stacking. damage_bonuses are added
+    to the matching calculate_outgoing_damage arguments of the holder's hits.
+    """
+
+    name: str
+    targets: Tuple[str, ...]
+    duration: int = 1
+    speed_percent: float = 0.0
+    flat_speed: float = 0.0
+    damage_bonuses: Tuple[Tuple[str, float], ...] = ()
+
+
+class Action(NamedTuple):
+    """
+    What a unit does on one turn.
+
+    Args:
+        damage_params: calculate_outgoing_damage arguments of the hit, or None for no damage.
+        advances: (unit name, fraction) pairs; 0.25 advances the unit's action by 25%,
+            a negative fraction delays it.
+        buffs: Buffs applied after the hit.
+    """
+
+    damage_params: Optional[Mapping[str, object]] = None
+    advances: Tuple[Tuple[str, float], ...] = ()
+    buffs: Tuple[Buff, ...] = ()
+
+
+class TimelineUnit(NamedTuple):
+    """
+    A character or enemy. Its actions are used in turn, cycling back to the first.
+    """
+
+    name: str
+    base_speed: float
+    actions: Tuple[Action, ...]
+    speed_percent: float = 0.0
+    flat_speed: float = 0.0
+
+
+class TimelineEvent(NamedTuple):
+    """
+    One turn taken during a simulation.
+    """
+
+    action_value: float
+    unit: str
+    action_index: int
+    damage: float
+    active_buffs: Tuple[Buff, ...]
+
+
+class TimelineResult(NamedTuple):
+    """
+    Every turn of a simulation plus the total damage, overall and per unit.
+    """
+
+    events: Tuple[TimelineEvent, ...]
+    total_damage: float
+    damage_by_unit: Dict[str, float]
+
+
+def cycle_action_value(cycles: int) -> float:
+    """
+    Returns the action value at the end of `cycles` cycles (150 AV for the first, 100 after).
+    """
+    if cycles < 1:
+        raise ValueError("cycles must be at least 1.")
+    return FIRST_CYCLE_AV + CYCLE_AV * (cycles - 1)
+
+
+def apply_damage_bonuses(
+    damage_params: Mapping[str, object], buffs: Sequence[Buff]
+) -> Dict[str, object]:
+    """
+    Returns a copy of damage_params with the buffs' damage bonuses added.
+    """
+    params = dict(damage_params)
+    for buff in buffs:
+        for name, bonus in buff.damage_bonuses:
+            params[name] = params[name] + bonus
+    return params
+
+
+class _UnitState:
+    __slots__ = ("unit", "position", "next_action_value", "version", "turns", "buffs")
+
+    def __init__(self, unit: TimelineUnit, position: int):
+        self.unit = unit
+        self.position = position
+        self.next_action_value = 0.0
+        self.version = 0
+        self.turns = 0
+        self.buffs: Dict[str, Tuple[Buff, int]] = {}
+
+    def speed(self) -> float:
+        speed_percent = self.unit.speed_percent + sum(buff.speed_percent for buff, _ in self.buffs.values())
+        flat_speed = self.unit.flat_speed + sum(buff.flat_speed for buff, _ in self.buffs.values())
+        return self.unit.base_speed * (1 + speed_percent) + flat_speed
+
+
+class TimelineSimulator:
+    """
+    Turn scheduler ordered by action value, using a heap of (next action value, unit order).
+
+    Advances, delays and speed changes re-push the unit with a new version; stale heap
+    entries are skipped when popped. A speed change keeps the remaining distance, so
+    only the time to cover it changes. Ties go to the unit listed first.
+    """
+
+    def __init__(self, units: Sequence[TimelineUnit]):
+        names = [unit.name for unit in units]
+        if len(set(names)) != len(names):
+            raise ValueError("Unit names must be unique.")
+        for unit in units:
+            if not unit.actions:
+                raise ValueError(f"Unit '{unit.name}' has no actions.")
+        self._states = {unit.name: _UnitState(unit, position) for position, unit in enumerate(units)}
+        self._heap: List[Tuple[float, int, int, str]] = []
+        self.action_value = 0.0
+        for state in self._states.values():
+            state.next_action_value = ACTION_GAUGE / self._checked_speed(state)
+            self._push(state)
+
+    @staticmethod
+    def _checked_speed(state: _UnitState) -> float:
+        speed = state.speed()
+        if speed <= 0:
+            raise ValueError(f"Unit '{state.unit.name}' has non-positive SPD.")
+        return speed
+
+    def _push(self, state: _UnitState) -> None:
+        state.version += 1
+        heapq.heappush(self._heap, (state.next_action_value, state.position, state.version, state.unit.name))
+
+    def speed(self, name: str) -> float:
+        return self._states[name].speed()
+
+    def advance(self, name: str, fraction: float) -> None:
+        """
+        Advances a unit's next action by a fraction of its full turn (delays if negative).
+        """
+        state = self._states[name]
+        shift = fraction * ACTION_GAUGE / self._checked_speed(state)
+        state.next_action_value = max(self.action_value, state.next_action_value - shift)
+        self._push(state)
+
+    def _rescale_remaining(self, state: _UnitState, old_speed: float) -> None:
+        new_speed = self._checked_speed(state)
+        if new_speed == old_speed:
+            return
+        remaining_distance = (state.next_action_value - self.action_value) * old_speed
+        state.next_action_value = self.action_value + remaining_distance / new_speed
+        self._push(state)
+
+    def apply_buff(self, buff: Buff) -> None:
+        for target in buff.targets:
+            state = self._states[target]
+            old_speed = state.speed()
+            state.buffs[buff.name] = (buff, buff.duration)
+            self._rescale_remaining(state, old_speed)
+
+    def _end_turn(self, state: _UnitState) -> None:
+        remaining = {}
+        for name, (buff, turns_left) in state.buffs.items():
+            if turns_left > 1:
+                remaining[name] = (buff, turns_left - 1)
+        state.buffs = remaining
+
+    def run(self, max_action_value: float, evaluate_damage: bool = True) -> TimelineResult:
+        """
+        Runs every turn up to and including max_action_value.
+
+        Args:
+            max_action_value: The action value to stop at.
+            evaluate_damage: If False, only the schedule is built and every damage is 0.
+
+        Returns:
+            A TimelineResult with one event per turn, in order.
+        """
+        events: List[TimelineEvent] = []
+        damage_by_unit = {name: 0.0 for name in self._states}
+        while self._heap:
+            action_value, _, version, name = self._heap[0]
+            state = self._states[name]
+            if version != state.version:
+                heapq.heappop(self._heap)
+                continue
+            if action_value > max_action_value:
+                break
+            heapq.heappop(self._heap)
+            self.action_value = action_value
+
+            action_index = state.turns % len(state.unit.actions)
+            action = state.unit.actions[action_index]
+            active_buffs = tuple(buff for buff, _ in state.buffs.values())
+            damage = 0.0
+            if evaluate_damage and action.damage_params is not None:
+                damage = calculate_outgoing_damage(**apply_damage_bonuses(action.damage_params, active_buffs))
+            damage_by_unit[name] += damage
+            events.append(TimelineEvent(action_value, name, action_index, damage, active_buffs))
+
+            # The turn ends (ticking the unit's buffs) and the next one is scheduled before
+            # the action's buffs land, so a buff the unit gives itself lasts its full
+            # duration and a SPD buff on itself already shortens its next turn.
+            state.turns += 1
+            self._end_turn(state)
+            state.next_action_value = action_value + ACTION_GAUGE / self._checked_speed(state)
+            self._push(state)
+            for buff in action.buffs:
+                self.apply_buff(buff)
+            for target, fraction in action.advances:
+                self.advance(target, fraction)
+
+        return TimelineResult(tuple(events), sum(damage_by_unit.values()), damage_by_unit)
+
+
+def simulate_timeline(units: Sequence[TimelineUnit], cycles: int) -> TimelineResult:
+    """
+    Simulates a fight for `cycles` cycles and totals the damage of every turn.
+
+    Each unit's turn comes every 10000 / SPD action value; the first cycle lasts
+    150 AV and every later one 100 AV.
+
+    Args:
+        units: The characters and enemies, in tie-break order.
+        cycles: The number of cycles to simulate.
+
+    Returns:
+        A TimelineResult.
+    """
+    return TimelineSimulator(units).run(cycle_action_value(cycles))